@@ -1,8 +1,10 @@
 from django.contrib import admin
-from .models import User, DynamicField, DynamicForm, Employee, EmployeeFieldValue
+from .models import User, DynamicField, DynamicForm, Employee, EmployeeFieldValue, DeletionJob, Task
 
 admin.site.register(User)
 admin.site.register(DynamicField)
 admin.site.register(DynamicForm)
 admin.site.register(Employee)
-admin.site.register(EmployeeFieldValue)
\ No newline at end of file
+admin.site.register(EmployeeFieldValue)
+admin.site.register(DeletionJob)
+admin.site.register(Task)
@@ -0,0 +1,140 @@
+"""Per-form aggregations computed in the database over the typed value columns.
+
+Every aggregate runs against the employees left after the employee_list
+``field_<id>`` filters, so the numbers always match what the list shows.
+"""
+from django.db.models import Avg, Count, F, FloatField, Max, Min, Q, Value
+from django.db.models.functions import Floor, Least, TruncDay, TruncMonth, TruncQuarter, TruncWeek, TruncYear
+
+from .filters import active_filters, filter_employees
+from .models import DATE_FIELD_TYPES, NUMBER_FIELD_TYPES, EmployeeFieldValue
+from .services import OPTION_FIELD_TYPES
+
+DATE_BUCKETS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth, "quarter": TruncQuarter, "year": TruncYear}
+DEFAULT_DATE_BUCKET = "month"
+DEFAULT_HISTOGRAM_BINS = 10
+MAX_HISTOGRAM_BINS = 100
+
+
+def field_values(employees, field):
+    """The non-empty EmployeeFieldValue rows of ``field`` for ``employees``."""
+    values = EmployeeFieldValue.objects.filter(field_id=field.id, employee_id__in=employees.values("id"))
+    return values.exclude(value_text__isnull=True).exclude(value_text="")
+
+
+def selected_option(option):
+    """Match a checkbox value (``opt,opt`` in ``value_text``) that includes ``option``, with LIKE only."""
+    option = option.strip().lower()
+    return (
+        Q(value_text=option) | Q(value_text__startswith=f"{option},")
+        | Q(value_text__endswith=f",{option}") | Q(value_text__contains=f",{option},")
+    )
+
+
+def option_counts(values, field):
+    """``[{"value", "count"}]`` for every option of a select/radio/checkbox field.
+
+    Checkbox values hold several comma-separated options, so each option is
+    counted with its own conditional COUNT in a single query.
+    """
+    options = list(field.options or [])
+    if field.field_type == "checkbox":
+        counts = values.aggregate(**{
+            f"option_{i}": Count("id", filter=selected_option(option)) for i, option in enumerate(options)
+        }) if options else {}
+        groups = [{"value": option, "count": counts[f"option_{i}"]} for i, option in enumerate(options)]
+    else:
+        counted = dict(values.order_by().values_list("value").annotate(count=Count("id")))
+        groups = [{"value": option, "count": counted.pop(option, 0)} for option in options]
+        groups.extend({"value": value, "count": count} for value, count in counted.items())
+    return sorted(groups, key=lambda group: -group["count"])
+
+
+def number_stats(values, bins=DEFAULT_HISTOGRAM_BINS):
+    values = values.exclude(value_number__isnull=True)
+    stats = values.aggregate(min=Min("value_number"), max=Max("value_number"), avg=Avg("value_number"), count=Count("id"))
+    histogram = []
+    if stats["count"]:
+        low, high = stats["min"], stats["max"]
+        width = (high - low) / bins if high > low else 1
+        bin_number = Least(Floor((F("value_number") - Value(low)) / Value(width)), Value(bins - 1), output_field=FloatField())
+        counts = dict(values.order_by().annotate(bin=bin_number).values_list("bin").annotate(count=Count("id")))
+        histogram = [
+            {"start": low + i * width, "end": low + (i + 1) * width, "count": counts.get(float(i), 0)}
+            for i in range(bins if high > low else 1)
+        ]
+    return {**stats, "histogram": histogram}
+
+
+def date_stats(values, bucket=DEFAULT_DATE_BUCKET):
+    values = values.exclude(value_date__isnull=True)
+    stats = values.aggregate(min=Min("value_date"), max=Max("value_date"), count=Count("id"))
+    buckets = (
+        values.order_by().annotate(bucket=DATE_BUCKETS[bucket]("value_date"))
+        .values_list("bucket").annotate(count=Count("id")).order_by("bucket")
+    )
+    return {
+        "min": stats["min"] and stats["min"].isoformat(),
+        "max": stats["max"] and stats["max"].isoformat(),
+        "count": stats["count"],
+        "bucket": bucket,
+        "buckets": [{"start": start.isoformat(), "count": count} for start, count in buckets],
+    }
+
+
+def aggregate_field(employees, field, bins=DEFAULT_HISTOGRAM_BINS, bucket=DEFAULT_DATE_BUCKET):
+    values = field_values(employees, field)
+    result = {"label": field.label, "field_type": field.field_type}
+    if field.field_type in OPTION_FIELD_TYPES:
+        result["count"] = values.count()
+        result["groups"] = option_counts(values, field)
+    elif field.field_type in NUMBER_FIELD_TYPES:
+        result.update(number_stats(values, bins))
+    elif field.field_type in DATE_FIELD_TYPES:
+        result.update(date_stats(values, bucket))
+    else:
+        result["count"] = values.count()
+    return result
+
+
+def facet_counts(employees, fields, params, filtered_groups=None, filter_fields=None):
+    """Option counts for the employee_list filter box, keyed by field id.
+
+    Each field's counts apply every active filter except its own, so the
+    box shows what a field's filter could be changed to. ``filtered_groups``
+    may hold counts already computed under all filters, reused for fields
+    that are not filtered themselves; ``filter_fields`` are the fields the
+    filters may refer to, ``fields`` by default.
+    """
+    filter_fields = fields if filter_fields is None else filter_fields
+    filters = active_filters(params)
+    facets = {}
+    for field in fields:
+        if field.field_type not in OPTION_FIELD_TYPES:
+            continue
+        key = f"field_{field.id}"
+        if key not in filters and filtered_groups and field.id in filtered_groups:
+            facets[field.id] = filtered_groups[field.id]
+            continue
+        others = {name: value for name, value in filters.items() if name != key}
+        facets[field.id] = option_counts(field_values(filter_employees(employees, filter_fields, others), field), field)
+    return facets
+
+
+def aggregate_form(employees, fields, params, bins=DEFAULT_HISTOGRAM_BINS, bucket=DEFAULT_DATE_BUCKET, selected=None):
+    """Count, per-field aggregates and facets for a form's filtered employees.
+
+    ``fields`` are all of the form's fields (filters may use any of them);
+    only those in ``selected``, when given, are aggregated.
+    """
+    selected = fields if selected is None else selected
+    filtered = filter_employees(employees, fields, params)
+    aggregates = {field.id: aggregate_field(filtered, field, bins, bucket) for field in selected}
+    groups = {field_id: result["groups"] for field_id, result in aggregates.items() if "groups" in result}
+    return {
+        "count": filtered.count(),
+        "fields": {str(field_id): result for field_id, result in aggregates.items()},
+        "facets": {
+            str(field_id): counts for field_id, counts in facet_counts(employees, selected, params, groups, fields).items()
+        },
+    }
@@ -0,0 +1,253 @@
+"""Async variants of the hot read paths and of login, for deployments served through asgi.py.
+
+They mirror the sync views in views.py (which stay in place for WSGI) but
+use Django's async ORM and cache APIs, so a slow client doesn't hold a
+worker thread while it waits. The login views check passwords on the
+bounded pool in passwords.py.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin, get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.shortcuts import render
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import CachedJWTAuthentication, check_token_user, dump_cached_user, load_cached_user, user_cache_key, \
+    user_cache_timeout
+from .conditional import make_etag, set_validators
+from .filters import FilterError, filter_employees
+from .models import DynamicField, DynamicForm, Employee, EmployeeFieldValue
+from .pagination import EmployeeKeysetPagination
+from .passwords import PoolSaturated, averify_credentials
+from .renderers import CompactRenderer, accepts_compact, dumps
+from .routers import replica_reads
+from .schema_cache import aget_form_schema
+from .rows import EMPLOYEE_COLUMNS, compact_rows, employee_rows
+from .search import index_available
+from .serializers import UserLoginSerializer
+from .sorting import SORT_PARAM, SortError, parse_sort
+from .views import employee_list_page, employee_list_rows, form_fields_data, selected_form_id
+
+User = get_user_model()
+
+
+async def aget_jwt_user(request):
+    """Resolve the user of a ``Bearer`` access token, or None."""
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+    entry = await cache.aget(user_cache_key(user_id))
+    if entry is not None:
+        user, password_changed = load_cached_user(entry)
+    else:
+        user = await User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is None:
+            return None
+        entry = dump_cached_user(user)
+        await cache.aset(user_cache_key(user_id), entry, user_cache_timeout())
+        password_changed = entry["password_changed"]
+    try:
+        check_token_user(user, token, password_changed)
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+def jwt_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aget_jwt_user(request)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+        request.api_user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def conditional(response_data, request, etag, last_modified=None, content_type="application/json"):
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return set_validators(not_modified, etag, last_modified)
+    response = HttpResponse(dumps(response_data), content_type=content_type)
+    return set_validators(response, etag, last_modified)
+
+
+def saturated_response():
+    response = JsonResponse({"success": False, "error": "Too many logins in progress, please retry."}, status=503)
+    response["Retry-After"] = "1"
+    return response
+
+
+@csrf_exempt
+async def login_user_async(request):
+    if request.method == "GET":
+        return render(request, "user/login.html")
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    username = request.POST.get("username")
+    password = request.POST.get("password")
+    if not username or not password:
+        return JsonResponse({"success": False, "error": "Both fields are required"}, status=400)
+
+    try:
+        user = await averify_credentials(request, username, password)
+    except PoolSaturated:
+        return saturated_response()
+    if user is None:
+        return JsonResponse({"success": False, "error": "Invalid username or password"}, status=400)
+
+    await alogin(request, user)
+    return JsonResponse({"success": True, "message": "Login successful"})
+
+
+@csrf_exempt
+async def login_api_async(request):
+    if request.method != "POST":
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        data = json.loads(request.body) if request.content_type == "application/json" else request.POST
+    except ValueError:
+        return JsonResponse({"detail": "JSON parse error"}, status=400)
+    serializer = UserLoginSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        user = await averify_credentials(request, serializer.validated_data["username"], serializer.validated_data["password"])
+    except PoolSaturated:
+        return saturated_response()
+    if user is None:
+        return JsonResponse({"success": False, "error": "Invalid username or password"}, status=401)
+
+    refresh = await sync_to_async(RefreshToken.for_user)(user)
+    return JsonResponse({"success": True, "access_token": str(refresh.access_token), "refresh_token": str(refresh)})
+
+
+@replica_reads
+async def get_form_fields_async(request, form_id):
+    schema = await aget_form_schema(form_id)
+    if schema is None:
+        return JsonResponse({"success": False, "error": "Form not found"}, status=404)
+    return JsonResponse({"success": True, "form": schema["name"], "fields": form_fields_data(schema)})
+
+
+@replica_reads
+async def form_list_async(request):
+    forms = [form async for form in DynamicForm.objects.all()]
+    user = await request.auser()
+    return render(request, "formbuilder/form_list.html", {"forms": forms, "user": user})
+
+
+async def awarm_search_index():
+    """Probe the search index, outside the event loop, on the alias the value filters will read."""
+    await sync_to_async(index_available)(router.db_for_read(EmployeeFieldValue))
+
+
+@replica_reads
+async def employee_list_data_async(request):
+    """The rows of the employee_list page as JSON, with the same filters and paging."""
+    form_id = selected_form_id(request)
+    form = None if form_id is None else await DynamicForm.objects.filter(id=form_id).afirst()
+    if form is None:
+        return JsonResponse({"success": False, "error": "Form not found"}, status=404)
+
+    fields = [field async for field in form.fields.all()]
+    await awarm_search_index()
+    try:
+        employees = filter_employees(Employee.objects.filter(form_id=form.id), fields, request.GET)
+        sort = parse_sort(request.GET.get(SORT_PARAM), fields)
+    except (FilterError, SortError) as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+    paginator = employee_list_page(employees, request, sort)
+    paginator.count = await paginator.object_list.acount()  # so get_page() doesn't count synchronously
+    page = paginator.get_page(request.GET.get("page"))
+    rows = employee_list_rows([row async for row in page.object_list], fields)
+    return JsonResponse({
+        "success": True,
+        "form": form.name,
+        "fields": [{"id": field.id, "label": field.label, "field_type": field.field_type} for field in fields],
+        "rows": rows,
+        "page": page.number,
+        "num_pages": paginator.num_pages,
+        "count": paginator.count,
+    })
+
+
+@jwt_required
+@replica_reads
+async def form_detail_api_async(request, id):
+    schema = await aget_form_schema(id)
+    if schema is None:
+        return JsonResponse({"detail": "No DynamicForm matches the given query."}, status=404)
+    body = dict(schema)
+    body.pop("schema_version")
+    etag = make_etag("form", schema["id"], schema["schema_version"], schema["updated_at"])
+    return conditional(body, request, etag, int(parse_datetime(schema["updated_at"]).timestamp()))
+
+
+@jwt_required
+@replica_reads
+async def employee_list_by_form_api_async(request, form_id):
+    versions = await DynamicForm.objects.filter(id=form_id).values_list("schema_version", "data_version").afirst()
+    if versions is None:
+        return JsonResponse({"next": None, "first": request.build_absolute_uri(), "results": []})
+
+    compact = accepts_compact(request)
+    etag = make_etag("employees", form_id, *versions, request.get_full_path(), compact)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        patch_vary_headers(not_modified, ["Accept"])
+        return set_validators(not_modified, etag)
+
+    paginator = EmployeeKeysetPagination()
+    page_size = paginator.get_page_size(request)
+    token = request.GET.get(paginator.cursor_query_param)
+    fields = [field async for field in DynamicField.objects.filter(form_id=form_id)]
+    await awarm_search_index()
+    employees = Employee.objects.filter(form_id=form_id).values(*EMPLOYEE_COLUMNS)
+    try:
+        employees = filter_employees(employees, fields, request.GET)
+        sort = parse_sort(request.GET.get(SORT_PARAM), fields)
+        employees = paginator.page_queryset(employees, token, sort)
+    except (FilterError, SortError) as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+    except NotFound as e:
+        return JsonResponse({"detail": str(e.detail)}, status=404)
+    results = [employee async for employee in employees[:page_size + 1]]
+
+    next_link = None
+    if len(results) > page_size:
+        results = results[:page_size]
+        cursor = paginator.cursor_after(results[-1], sort)
+        next_link = replace_query_param(request.build_absolute_uri(), paginator.cursor_query_param, cursor)
+
+    first_link = remove_query_param(request.build_absolute_uri(), paginator.cursor_query_param)
+    if compact:
+        response = conditional(
+            {"next": next_link, "first": first_link, **compact_rows(results, fields)},
+            request, etag, content_type=CompactRenderer.media_type,
+        )
+    else:
+        response = conditional({"next": next_link, "first": first_link, "results": employee_rows(results, fields)}, request, etag)
+    patch_vary_headers(response, ["Accept"])
+    return response
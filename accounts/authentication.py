@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def user_cache_key(user_id):
+    return f"jwt-user:{user_id}"
+
+
+def user_cache_timeout():
+    return getattr(settings, "JWT_USER_CACHE_TIMEOUT", 60)
+
+
+# What the cache keeps of a user: enough to authenticate and check
+# permissions, never the password hash (the cache may be shared or on disk).
+CACHED_USER_FIELDS = ("id", "username", "is_active", "is_staff", "is_superuser")
+
+
+def dump_cached_user(user):
+    return {
+        "db": user._state.db,
+        "fields": {name: getattr(user, name) for name in CACHED_USER_FIELDS},
+        "password_changed": get_md5_hash_password(user.password),
+    }
+
+
+def load_cached_user(entry):
+    """Rebuild a user from ``dump_cached_user``; its other fields load from the database on access."""
+    model = get_user_model()
+    fields = entry["fields"]
+    # from_db takes the loaded values in the model's field order.
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in fields]
+    user = model.from_db(entry["db"], names, [fields[name] for name in names])
+    return user, entry["password_changed"]
+
+
+def check_token_user(user, validated_token, password_changed):
+    """Run simplejwt's user checks for ``user``, whose password hash digest is ``password_changed``.
+
+    Raises AuthenticationFailed like ``JWTAuthentication.get_user``.
+    """
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_changed:
+        raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached user once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(user_cache_key(user_id)))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that caches the token's user for ``JWT_USER_CACHE_TIMEOUT`` seconds.
+
+    Saving or deleting a user drops its entry (see signals.py), so password
+    changes and profile updates are seen on the next request. Only
+    CACHED_USER_FIELDS are cached; views reading anything else load it.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        entry = cache.get(user_cache_key(user_id))
+        if entry is None:
+            user = super().get_user(validated_token)
+            cache.set(user_cache_key(user_id), dump_cached_user(user), user_cache_timeout())
+            return user
+        user, password_changed = load_cached_user(entry)
+        # Same checks as a fresh lookup: the entry may be shared by tokens issued before a change.
+        check_token_user(user, validated_token, password_changed)
+        return user
@@ -0,0 +1,117 @@
+"""Profile picture variants.
+
+Uploads are kept as the original file; after the upload commits, an
+``avatars.process_profile_picture`` task (see accounts.queue) renders
+square WebP and JPEG variants for every size in ``PROFILE_PICTURE_SIZES``
+and records them on ``User.profile_picture_variants``::
+
+    {"digest": "<hash of the original>", "sizes": {"120": {"webp": path, "jpeg": path}, ...}}
+
+Variant URLs embed the digest, so ``profile_picture_variant`` can serve
+them as immutable for a year.
+"""
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True})}
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def variant_sizes():
+    return tuple(getattr(settings, "PROFILE_PICTURE_SIZES", (120, 240)))
+
+
+def file_digest(file, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    for chunk in file.chunks(chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def render_variant(image, size, file_format):
+    variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    pil_format, options = VARIANT_FORMATS[file_format]
+    variant.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(user):
+    """Render and store the variants of ``user.profile_picture``, returning the variants dict."""
+    with user.profile_picture.open("rb") as source:
+        digest = file_digest(source)
+        source.seek(0)
+        image = Image.open(source)
+        image.draft("RGB", (max(variant_sizes()) * 2,) * 2)  # lets JPEG decode at reduced scale
+        image = ImageOps.exif_transpose(image).convert("RGB")
+
+    sizes = {}
+    for size in variant_sizes():
+        sizes[str(size)] = {}
+        for file_format in VARIANT_FORMATS:
+            name = f"profiles/variants/{user.pk}/{digest}-{size}.{file_format}"
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(render_variant(image, size, file_format)))
+            sizes[str(size)][file_format] = name
+    return {"digest": digest, "sizes": sizes}
+
+
+def delete_variant_files(variants, keep=None):
+    keep = {name for formats in (keep or {}).get("sizes", {}).values() for name in formats.values()}
+    for formats in (variants or {}).get("sizes", {}).values():
+        for name in formats.values():
+            if name not in keep:
+                default_storage.delete(name)
+
+
+def process_profile_picture(user_id, picture_name):
+    """Generate the variants for a user's picture, unless it changed meanwhile."""
+    from .authentication import invalidate_cached_user
+    from .models import User
+
+    user = User.objects.filter(id=user_id).first()
+    if user is None or user.profile_picture.name != picture_name:
+        return
+    if not picture_name:
+        delete_variant_files(user.profile_picture_variants)
+        User.objects.filter(id=user_id).update(profile_picture_variants={})
+    else:
+        try:
+            variants = generate_variants(user)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            logger.warning("Could not process the profile picture of user %s", user_id, exc_info=True)
+            return
+        # Only record them if the picture is still the one that was processed.
+        updated = User.objects.filter(id=user_id, profile_picture=picture_name).update(profile_picture_variants=variants)
+        if not updated:
+            delete_variant_files(variants)
+            return
+        delete_variant_files(user.profile_picture_variants, keep=variants)
+    invalidate_cached_user(user_id)
+
+
+def schedule_profile_picture(user_id, picture_name):
+    """Queue the picture for processing once the current transaction commits."""
+    from .queue import enqueue
+
+    enqueue("avatars.process_profile_picture", user_id=user_id, picture_name=picture_name)
+
+
+def avatar_url(user, size):
+    """URL of the variant closest to ``size`` (the original until variants exist), or ""."""
+    if not user.profile_picture:
+        return ""
+    variants = user.profile_picture_variants or {}
+    if not variants.get("sizes"):
+        return user.profile_picture.url
+    best = min(variants["sizes"], key=lambda available: (int(available) < size, abs(int(available) - size)))
+    return reverse("profile_picture_variant", args=[user.pk, int(best), variants["digest"]])
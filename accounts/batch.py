@@ -0,0 +1,173 @@
+"""Mixed create/update/delete operations on employees in one request.
+
+Operations are validated up front, then executed set-wise: all creates of a
+form go through one ``create_employees`` call, all updates through one
+``update_employees_values`` call and all deletes through one
+``delete_employees`` call. In atomic mode the whole batch is one transaction
+and nothing is written if any operation is invalid; otherwise valid
+operations are written in chunks of ``chunk_size``, one transaction each,
+and failures are reported per operation.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+from .models import DynamicField, DynamicForm, Employee
+from .services import create_employees, delete_employees, resolve_field_values, update_employees_values
+
+BATCH_OPERATIONS = ("create", "update", "delete")
+MAX_BATCH_OPERATIONS = 5000
+DEFAULT_CHUNK_SIZE = 500
+
+
+def as_id(value):
+    """An id given as an int or a numeric string (like the other endpoints accept), else None."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def clean_values(fields_by_id, fields_data, partial):
+    """Resolve ``[{"field_id", "value"}]`` onto the form, returning ``(values, errors)``.
+
+    Values are stored as strings, as the HTML and import paths do. Creates
+    are validated against every field of the form; partial updates only
+    against the submitted ones.
+    """
+    if not isinstance(fields_data, list) or not all(isinstance(item, dict) for item in fields_data):
+        return None, {"fields": "Expected a list of {field_id, value} objects."}
+    try:
+        values = resolve_field_values(fields_by_id, fields_data, partial=partial)
+    except ValidationError as e:
+        return None, e.message_dict
+    return {field_id: "" if value is None else str(value) for field_id, value in values.items()}, {}
+
+
+def plan_operations(operations):
+    """Validate every operation, returning ``(planned, results, fields_by_form)``.
+
+    ``planned`` holds ``(index, op, target, values)`` for the valid
+    operations; ``results`` holds the error result of the invalid ones.
+    Forms, employees and fields are each loaded with a single query.
+    """
+    results = [None] * len(operations)
+
+    def fail(index, op, errors):
+        results[index] = {"index": index, "op": op, "status": "error", "errors": errors}
+
+    form_ids, employee_ids = set(), set()
+    for operation in operations:
+        if isinstance(operation, dict):
+            if operation.get("op") == "create" and as_id(operation.get("form_id")) is not None:
+                form_ids.add(as_id(operation["form_id"]))
+            elif operation.get("op") in ("update", "delete") and as_id(operation.get("id")) is not None:
+                employee_ids.add(as_id(operation["id"]))
+
+    forms = DynamicForm.objects.in_bulk(form_ids)
+    employees = Employee.objects.select_related("form").in_bulk(employee_ids)
+    fields_by_form = defaultdict(dict)
+    all_form_ids = set(forms) | {employee.form_id for employee in employees.values()}
+    for field in DynamicField.objects.filter(form_id__in=all_form_ids):
+        fields_by_form[field.form_id][field.id] = field
+
+    planned = []
+    seen_employees = set()
+    for index, operation in enumerate(operations):
+        op = operation.get("op") if isinstance(operation, dict) else None
+        if op not in BATCH_OPERATIONS:
+            fail(index, op, {"op": f"Expected one of {', '.join(BATCH_OPERATIONS)}."})
+            continue
+
+        if op == "create":
+            form = forms.get(as_id(operation.get("form_id")))
+            if form is None:
+                fail(index, op, {"form_id": "Form not found."})
+                continue
+            values, errors = clean_values(fields_by_form[form.id], operation.get("fields"), partial=False)
+            if errors:
+                fail(index, op, errors)
+                continue
+            planned.append((index, op, form, values))
+            continue
+
+        employee = employees.get(as_id(operation.get("id")))
+        if employee is None:
+            fail(index, op, {"id": "Employee not found."})
+            continue
+        if employee.id in seen_employees:
+            fail(index, op, {"id": f"Employee {employee.id} is changed by more than one operation."})
+            continue
+        seen_employees.add(employee.id)
+
+        values = None
+        if op == "update":
+            values, errors = clean_values(fields_by_form[employee.form_id], operation.get("fields"), partial=True)
+            if errors:
+                fail(index, op, errors)
+                continue
+        planned.append((index, op, employee, values))
+    return planned, results, fields_by_form
+
+
+def execute_chunk(chunk, fields_by_form, results):
+    creates = defaultdict(list)
+    updates, deletes = [], []
+    for index, op, target, values in chunk:
+        if op == "create":
+            creates[target].append((index, values))
+        elif op == "update":
+            updates.append((index, target, values))
+        else:
+            deletes.append((index, target))
+
+    with transaction.atomic():
+        for form, rows in creates.items():
+            created = create_employees(form, fields_by_form[form.id], [values for _, values in rows])
+            for (index, _), employee in zip(rows, created):
+                results[index] = {"index": index, "op": "create", "status": "ok", "id": employee.id}
+        if updates:
+            update_employees_values([
+                (employee, fields_by_form[employee.form_id], values) for _, employee, values in updates
+            ])
+            for index, employee, _ in updates:
+                results[index] = {"index": index, "op": "update", "status": "ok", "id": employee.id}
+        if deletes:
+            delete_employees(Employee.objects.filter(id__in=[employee.id for _, employee in deletes]))
+            for index, employee in deletes:
+                results[index] = {"index": index, "op": "delete", "status": "ok", "id": employee.id}
+
+
+def run_batch(operations, atomic=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Run a list of operations and return a report with one result per operation, in order.
+
+    Each operation is ``{"op": "create", "form_id", "fields"}``,
+    ``{"op": "update", "id", "fields"}`` or ``{"op": "delete", "id"}``.
+    """
+    planned, results, fields_by_form = plan_operations(operations)
+
+    if atomic and len(planned) < len(operations):
+        for index, op, _, _ in planned:
+            results[index] = {"index": index, "op": op, "status": "skipped"}
+        planned = []
+
+    step = len(planned) if atomic else chunk_size
+    for start in range(0, len(planned), max(step, 1)):
+        chunk = planned[start:start + step]
+        try:
+            execute_chunk(chunk, fields_by_form, results)
+        except DatabaseError as e:
+            for index, op, _, _ in chunk:
+                results[index] = {"index": index, "op": op, "status": "error", "errors": {"database": str(e)}}
+
+    report = {"created": 0, "updated": 0, "deleted": 0, "failed": 0, "skipped": 0}
+    counters = {"create": "created", "update": "updated", "delete": "deleted"}
+    for result in results:
+        if result["status"] == "ok":
+            report[counters[result["op"]]] += 1
+        else:
+            report["failed" if result["status"] == "error" else "skipped"] += 1
+    return {"success": report["failed"] == 0 and report["skipped"] == 0, **report, "results": results}
@@ -0,0 +1,340 @@
+"""Benchmark data and suite for the form/employee hot paths.
+
+``manage.py seed_bench`` fills the database with generated forms and
+employees, and ``manage.py bench`` runs the suite below against it. Each
+benchmark receives a ``BenchContext`` and returns the callable to time, so
+per-benchmark setup stays outside the measurement.
+"""
+import asyncio
+import datetime
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import FIELD_TYPES, DynamicForm, Employee
+from .renderers import OrjsonRenderer
+from .rows import EMPLOYEE_COLUMNS, FORM_COLUMNS, employee_rows, form_rows
+from .serializers import DynamicFormSerializer, EmployeeSnapshotSerializer
+from .services import create_employees, create_form, get_fields_by_id
+
+FIRST_NAMES = ["Asha", "Ravi", "Meera", "John", "Fatima", "Chen", "Lucia", "Omar", "Priya", "Ken", "Anna", "Diego"]
+LAST_NAMES = ["Nair", "Kumar", "Smith", "Garcia", "Khan", "Wang", "Rossi", "Ito", "Menon", "Brown", "Silva", "Das"]
+WORDS = ["team", "lead", "remote", "backend", "client", "project", "review", "sales", "support", "quarterly", "office", "travel"]
+OPTIONS = ["Engineering", "Sales", "Support", "Finance", "Marketing", "Operations"]
+BENCH_PASSWORD = "bench-Password-1"
+SERIALIZE_PAGE_SIZE = 500
+
+BENCHMARKS = {}
+
+
+def fake_value(field, rng):
+    """A realistic value for ``field`` that passes ``validate_field_value``."""
+    field_type = field.field_type
+    if field_type == "text":
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    if field_type == "textarea":
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 20))).capitalize() + "."
+    if field_type == "number":
+        return str(rng.randint(20000, 200000))
+    if field_type == "date":
+        return (datetime.date(1970, 1, 1) + datetime.timedelta(days=rng.randint(0, 20000))).isoformat()
+    if field_type == "email":
+        return f"{rng.choice(FIRST_NAMES).lower()}.{rng.randint(1, 99999)}@example.com"
+    if field_type == "password":
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(12))
+    if field_type == "checkbox":
+        return ",".join(rng.sample(field.options, rng.randint(1, 3)))
+    return rng.choice(field.options)
+
+
+def seed_forms(forms, fields_per_form, employees_per_form, seed=0, batch_size=1000):
+    """Create ``forms`` forms whose fields cycle through every FIELD_TYPES kind."""
+    rng = random.Random(seed)
+    field_types = [field_type for field_type, _ in FIELD_TYPES]
+    created = []
+    for form_number in range(forms):
+        fields_data = []
+        for order in range(fields_per_form):
+            field_type = field_types[order % len(field_types)]
+            fields_data.append({
+                "label": f"{field_type.capitalize()} {order + 1}",
+                "field_type": field_type,
+                "required": field_type != "textarea",
+                "options": OPTIONS if field_type in ("select", "radio", "checkbox") else None,
+                "order": order,
+            })
+        form = create_form({"name": f"Bench form {form_number + 1}", "description": "Generated by seed_bench"}, fields_data)
+        fields_by_id = get_fields_by_id(form)
+
+        remaining = employees_per_form
+        while remaining > 0:
+            rows = [
+                {field_id: fake_value(field, rng) for field_id, field in fields_by_id.items()}
+                for _ in range(min(batch_size, remaining))
+            ]
+            create_employees(form, fields_by_id, rows)
+            remaining -= len(rows)
+        created.append(form)
+    return created
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class BenchContext:
+    def __init__(self, form, user, seed=0):
+        self.form = form
+        self.fields = list(form.fields.all())
+        self.user = user
+        self.rng = random.Random(seed)
+        self.client = Client()
+        self.client.force_login(user)
+        token = RefreshToken.for_user(user).access_token
+        self.api = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.employee_id = Employee.objects.filter(form=form).values_list("id", flat=True).first()
+
+    def field_payload(self):
+        return [{"field_id": field.id, "value": fake_value(field, self.rng)} for field in self.fields]
+
+    def sample_filters(self):
+        """``field_<id>`` filters on the first text and option fields of the form."""
+        filters = {}
+        for field in self.fields:
+            if field.field_type == "text" and "text" not in filters:
+                filters["text"] = (f"field_{field.id}", LAST_NAMES[0].lower())
+            elif field.field_type == "select" and "select" not in filters:
+                filters["select"] = (f"field_{field.id}", OPTIONS[0])
+        return dict(filters.values())
+
+
+def run_benchmark(func, ctx, repeat):
+    run = func(ctx)
+    timings, queries = [], []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "max_ms": round(timings[-1], 3),
+        "queries": max(queries),
+    }
+
+
+def run_suite(ctx, names, repeat):
+    return {
+        "meta": {
+            "timestamp": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "forms": DynamicForm.objects.count(),
+            "form_id": ctx.form.id,
+            "fields": len(ctx.fields),
+            "employees": Employee.objects.filter(form=ctx.form).count(),
+            "repeat": repeat,
+        },
+        "results": {name: run_benchmark(BENCHMARKS[name], ctx, repeat) for name in names},
+    }
+
+
+def measure_logins(login, total, concurrency):
+    start = time.perf_counter()
+    statuses = login(total, concurrency)
+    seconds = time.perf_counter() - start
+    ok = statuses.count(200)
+    return {
+        "seconds": round(seconds, 3),
+        "logins_per_second": round(ok / seconds, 2),
+        "ok": ok,
+        "rejected": statuses.count(503),
+        "failed": len(statuses) - ok - statuses.count(503),
+    }
+
+
+def login_throughput(username, total=100, concurrency=16):
+    """Logins per second with ``concurrency`` clients, through the sync and the async login API.
+
+    Sync logins run on a thread per client, as a threaded WSGI server would;
+    async ones as tasks on one event loop, hashing on the bounded pool.
+    """
+    body = {"username": username, "password": BENCH_PASSWORD}
+
+    def sync_logins(total, concurrency):
+        url = reverse("api-login")
+
+        def login(_):
+            return Client().post(url, body, content_type="application/json").status_code
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(login, range(total)))
+
+    def async_logins(total, concurrency):
+        url = reverse("api-login-async")
+
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def login():
+                async with semaphore:
+                    response = await client.post(url, body, content_type="application/json")
+                    return response.status_code
+
+            return await asyncio.gather(*(login() for _ in range(total)))
+
+        return asyncio.run(run())
+
+    # Rejected logins are expected here; don't log every 503.
+    request_logger = logging.getLogger("django.request")
+    level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        return {
+            "total": total,
+            "concurrency": concurrency,
+            "sync": measure_logins(sync_logins, total, concurrency),
+            "async": measure_logins(async_logins, total, concurrency),
+        }
+    finally:
+        request_logger.setLevel(level)
+
+
+def check(response, status=200):
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request['PATH_INFO']} returned {response.status_code}")
+    return response
+
+
+@benchmark("save_employee")
+def bench_save_employee(ctx):
+    url = reverse("save_employee")
+    body = json.dumps({"form_id": ctx.form.id, "fields": ctx.field_payload()})
+    return lambda: check(ctx.client.post(url, body, content_type="application/json"))
+
+
+@benchmark("employee_list")
+def bench_employee_list(ctx):
+    url = reverse("employee_list")
+    return lambda: check(ctx.client.get(url, {"form": ctx.form.id}))
+
+
+@benchmark("employee_list_filtered")
+def bench_employee_list_filtered(ctx):
+    url = reverse("employee_list")
+    params = {"form": ctx.form.id, **ctx.sample_filters()}
+    return lambda: check(ctx.client.get(url, params))
+
+
+@benchmark("get_form_fields")
+def bench_get_form_fields(ctx):
+    url = reverse("get_form_fields", args=[ctx.form.id])
+    return lambda: check(ctx.client.get(url))
+
+
+@benchmark("api_employee_list")
+def bench_api_employee_list(ctx):
+    url = reverse("employee-list-by-form", args=[ctx.form.id])
+    return lambda: check(ctx.api.get(url))
+
+
+@benchmark("api_employee_list_500")
+def bench_api_employee_list_500(ctx):
+    url = reverse("employee-list-by-form", args=[ctx.form.id])
+    return lambda: check(ctx.api.get(url, {"page_size": SERIALIZE_PAGE_SIZE}))
+
+
+@benchmark("api_employee_list_500_compact")
+def bench_api_employee_list_500_compact(ctx):
+    url = reverse("employee-list-by-form", args=[ctx.form.id])
+    return lambda: check(ctx.api.get(url, {"page_size": SERIALIZE_PAGE_SIZE, "format": "compact"}))
+
+
+# Read and render one page of employees / all forms, through the serializers
+# and JSONRenderer the list APIs used to use and through the lean path.
+
+@benchmark("render_employees_serializer")
+def bench_render_employees_serializer(ctx):
+    def run():
+        employees = Employee.objects.filter(form=ctx.form).only(*EMPLOYEE_COLUMNS).order_by("created_at", "id")
+        data = EmployeeSnapshotSerializer(employees[:SERIALIZE_PAGE_SIZE], many=True, context={"form_fields": ctx.fields}).data
+        return JSONRenderer().render(data)
+    return run
+
+
+@benchmark("render_employees_lean")
+def bench_render_employees_lean(ctx):
+    def run():
+        employees = Employee.objects.filter(form=ctx.form).values(*EMPLOYEE_COLUMNS).order_by("created_at", "id")
+        return OrjsonRenderer().render(employee_rows(employees[:SERIALIZE_PAGE_SIZE], ctx.fields))
+    return run
+
+
+@benchmark("render_forms_serializer")
+def bench_render_forms_serializer(ctx):
+    def run():
+        forms = DynamicForm.objects.prefetch_related("fields").order_by("-created_at", "-id")
+        return JSONRenderer().render(DynamicFormSerializer(forms[:SERIALIZE_PAGE_SIZE], many=True).data)
+    return run
+
+
+@benchmark("render_forms_lean")
+def bench_render_forms_lean(ctx):
+    def run():
+        forms = DynamicForm.objects.values(*FORM_COLUMNS).order_by("-created_at", "-id")
+        return OrjsonRenderer().render(form_rows(forms[:SERIALIZE_PAGE_SIZE]))
+    return run
+
+
+@benchmark("api_employee_create")
+def bench_api_employee_create(ctx):
+    url = reverse("employee-create")
+    body = {"form_id": ctx.form.id, "fields": ctx.field_payload()}
+    return lambda: check(ctx.api.post(url, body, content_type="application/json"), 201)
+
+
+@benchmark("api_employee_update")
+def bench_api_employee_update(ctx):
+    url = reverse("employee-update", args=[ctx.employee_id])
+    body = {"fields": ctx.field_payload()}
+    return lambda: check(ctx.api.put(url, body, content_type="application/json"))
+
+
+@benchmark("export_csv")
+def bench_export_csv(ctx):
+    url = reverse("export_employees", args=[ctx.form.id])
+
+    def run():
+        for _ in check(ctx.client.get(url)).streaming_content:
+            pass
+    return run
+
+
+@benchmark("api_login")
+def bench_api_login(ctx):
+    url = reverse("api-login")
+    body = {"username": ctx.user.username, "password": BENCH_PASSWORD}
+    return lambda: check(Client().post(url, body, content_type="application/json"))
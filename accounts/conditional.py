@@ -0,0 +1,46 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified support for DRF ``get`` handlers.
+
+    Views implement ``get_etag`` (and optionally ``get_last_modified``) from
+    cheap version information; when the client's validators still match, a
+    304 is returned before the response body is built.
+    """
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        last_modified = self.get_last_modified(request, *args, **kwargs)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add ``ETag``/``Last-Modified`` to a 200, or to a 304 (which RFC 9110 requires to repeat them)."""
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def make_etag(*parts):
+    """Build a strong ETag from version parts (and e.g. the request path)."""
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
@@ -0,0 +1,108 @@
+"""Chunked deletes of large employee sets and forms.
+
+Deleting a big form in one statement cascades through every Employee and
+EmployeeFieldValue inside a single transaction, which holds SQLite's write
+lock for the whole time. Here the matching employees are deleted
+``DELETE_CHUNK_SIZE`` at a time, one short transaction per chunk with a
+pause in between, by a ``deletions.run_job`` task (see accounts.queue), and
+progress is recorded on a ``DeletionJob``. Small deletes still run inline.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .filters import FilterError, filter_employees, unknown_field_filters
+from .models import DeletionJob, DynamicField, DynamicForm, Employee
+from .queue import enqueue
+from .services import delete_employees
+
+
+def chunk_size():
+    return getattr(settings, "DELETE_CHUNK_SIZE", 1000)
+
+
+def matching_employees(form_id, filters=None, max_employee_id=None):
+    employees = Employee.objects.filter(form_id=form_id)
+    if max_employee_id is not None:
+        employees = employees.filter(id__lte=max_employee_id)
+    if filters:
+        employees = filter_employees(employees, list(DynamicField.objects.filter(form_id=form_id)), filters)
+    return employees
+
+
+def delete_matching_employees(form, filters, user=None):
+    """Delete the employees of ``form`` matching ``filters``.
+
+    Returns ``(deleted, job)``: the count when the delete ran inline, or the
+    scheduled DeletionJob when there were more than one chunk's worth.
+    Raises FilterError for a ``field_<id>`` filter naming no field of the
+    form, which the list views would ignore and so match every employee.
+    """
+    unknown = unknown_field_filters(filters, DynamicField.objects.filter(form_id=form.id))
+    if unknown:
+        raise FilterError(f"Unknown field filter {', '.join(unknown)} for this form.")
+    employees = matching_employees(form.id, filters)
+    total = employees.count()
+    if total <= chunk_size():
+        return delete_employees(employees), None
+
+    max_employee_id = employees.aggregate(max_id=Max("id"))["max_id"]
+    job = DeletionJob.objects.create(
+        kind="employees", form_id=form.id, filters=filters, max_employee_id=max_employee_id,
+        total=total, created_by=user,
+    )
+    start_job(job)
+    return None, job
+
+
+def delete_form(form, user=None):
+    """Delete ``form`` with its employees, in the background when it has more than one chunk."""
+    total = Employee.objects.filter(form_id=form.id).count()
+    if total <= chunk_size():
+        with transaction.atomic():
+            form.delete()
+        return total, None
+
+    job = DeletionJob.objects.create(kind="form", form_id=form.id, total=total, created_by=user)
+    start_job(job)
+    return None, job
+
+
+def start_job(job):
+    """Queue ``job`` for the workers; it is picked up once the current transaction commits."""
+    enqueue("deletions.run_job", user=job.created_by, job_id=job.id)
+
+
+def run_job(job_id, on_progress=None):
+    """Run (or resume) a deletion job to completion, recording progress after each chunk.
+
+    ``on_progress(deleted, total)`` is called after each chunk as well.
+    """
+    job = DeletionJob.objects.get(id=job_id)
+    DeletionJob.objects.filter(id=job.id).update(status="running", updated_at=timezone.now())
+    pause = getattr(settings, "DELETE_CHUNK_PAUSE", 0.05)
+    # A form job deletes every employee the form has, including ones added meanwhile.
+    max_employee_id = None if job.kind == "form" else job.max_employee_id
+    employees = matching_employees(job.form_id, job.filters, max_employee_id)
+    try:
+        while True:
+            ids = list(employees.order_by("id").values_list("id", flat=True)[:chunk_size()])
+            if not ids:
+                break
+            deleted = delete_employees(Employee.objects.filter(id__in=ids))
+            DeletionJob.objects.filter(id=job.id).update(deleted=F("deleted") + deleted, updated_at=timezone.now())
+            if on_progress is not None:
+                job.refresh_from_db(fields=["deleted"])
+                on_progress(job.deleted, job.total)
+            if pause:
+                time.sleep(pause)
+        if job.kind == "form":
+            with transaction.atomic():
+                DynamicForm.objects.filter(id=job.form_id).delete()
+    except Exception as e:
+        DeletionJob.objects.filter(id=job.id).update(status="failed", error=str(e), updated_at=timezone.now())
+        raise
+    DeletionJob.objects.filter(id=job.id).update(status="done", finished_at=timezone.now(), updated_at=timezone.now())
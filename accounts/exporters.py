@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+import zlib
+
+DEFAULT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+# Spreadsheets run cells starting with these as formulas; such cells are prefixed with "'".
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_formula(value):
+    """Make a user-entered CSV cell inert in spreadsheets (the importer strips the prefix again)."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_employee_rows(employees, fields, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``(employee_id, created_at, [value, ...])`` per employee.
+
+    Rows come from the ``Employee.data`` snapshot through a chunked iterator
+    and are laid out in the order of ``fields``, so memory stays bounded by
+    ``chunk_size`` whatever the size of the form.
+    """
+    keys = [str(field.id) for field in fields]
+    rows = employees.order_by("id").values_list("id", "created_at", "data")
+    for employee_id, created_at, data in rows.iterator(chunk_size=chunk_size):
+        yield employee_id, created_at, ["" if data.get(key) is None else data[key] for key in keys]
+
+
+def iter_csv(employees, fields, chunk_size=DEFAULT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "created_at", *(escape_formula(field.label) for field in fields)])
+    for count, (employee_id, created_at, values) in enumerate(iter_employee_rows(employees, fields, chunk_size), start=1):
+        writer.writerow([employee_id, created_at.isoformat(), *map(escape_formula, values)])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(employees, fields, chunk_size=DEFAULT_CHUNK_SIZE):
+    labels = [field.label for field in fields]
+    lines = []
+    for employee_id, created_at, values in iter_employee_rows(employees, fields, chunk_size):
+        record = {"id": employee_id, "created_at": created_at.isoformat(), **dict(zip(labels, values))}
+        lines.append(json.dumps(record))
+        if len(lines) >= chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_employees(employees, fields, file_format="csv", compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return an iterator of export chunks: ``str``, or gzip ``bytes`` when ``compress``."""
+    writer = iter_jsonl if file_format == "jsonl" else iter_csv
+    chunks = writer(employees, fields, chunk_size)
+    return gzip_stream(chunks) if compress else chunks
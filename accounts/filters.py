@@ -0,0 +1,197 @@
+"""Employee filters: the list's ``field_<id>`` boxes and the ``filter`` expression language.
+
+``?filter=`` takes a JSON expression over a form's field ids::
+
+    {"and": [
+        {"field": 3, "op": "in", "value": ["Sales", "Support"]},
+        {"or": [{"field": 5, "op": "range", "value": [50000, null]},
+                {"not": {"field": 7, "op": "empty"}}]}
+    ]}
+
+A bare list is an ``and``. Every condition compiles to one semi-join,
+``id [NOT] IN (SELECT employee_id ...)``, over EmployeeFieldValue on the
+column matching the field type (``value_number`` for numbers,
+``value_date`` for dates, the lower-cased ``value_text`` otherwise). Each
+subquery is uncorrelated and reads the (field, value) indexes once, so
+filters add no joins or DISTINCT. (A correlated ``EXISTS`` is equivalent,
+but SQLite runs it per employee through the same index, which is orders of
+magnitude slower.) Operators:
+
+- ``eq``/``ne``: equal / not equal (``ne`` includes employees without a value)
+- ``in``: equal to one of a list of values
+- ``prefix``: text starts with the value
+- ``contains``: text contains the value (through the search index)
+- ``range``: ``[low, high]`` inclusive, either end may be null
+- ``empty``: no value (``"value": false`` for "has a value")
+- ``match``: what the list's filter boxes do, exact for numbers and dates
+  and a substring match otherwise
+"""
+import json
+
+from django.db.models import Q
+
+from .models import DATE_FIELD_TYPES, NUMBER_FIELD_TYPES, EmployeeFieldValue, typed_lookup, typed_values
+from .search import filter_contains
+
+FILTER_OPERATORS = ("eq", "ne", "in", "prefix", "contains", "range", "empty", "match")
+MAX_FILTER_CONDITIONS = 32
+MAX_FILTER_DEPTH = 8
+MAX_IN_VALUES = 200
+
+
+class FilterError(ValueError):
+    """An invalid ``filter`` expression; the message is safe to show to the client."""
+
+
+def active_filters(params):
+    """The ``field_<id>`` filters and ``filter`` expression of ``params`` that have a value."""
+    return {
+        key: value for key, value in params.items()
+        if (key.startswith("field_") or key == "filter") and str(value).strip()
+    }
+
+
+def unknown_field_filters(params, fields):
+    """The ``field_<id>`` keys of ``params`` that name no field in ``fields`` (``filter_employees`` ignores them)."""
+    field_ids = {str(field.id) for field in fields}
+    return [key for key in active_filters(params) if key.startswith("field_") and key[len("field_"):] not in field_ids]
+
+
+def parse_filter(raw):
+    """Decode a ``filter`` parameter; it may already be decoded (e.g. from a JSON body)."""
+    if not isinstance(raw, str):
+        return raw
+    try:
+        return json.loads(raw)
+    except ValueError:
+        raise FilterError("filter must be a JSON expression.")
+    except RecursionError:
+        raise FilterError(f"filter nests deeper than {MAX_FILTER_DEPTH} levels.")
+
+
+def typed_column(field_type):
+    if field_type in NUMBER_FIELD_TYPES:
+        return "value_number"
+    if field_type in DATE_FIELD_TYPES:
+        return "value_date"
+    return "value_text"
+
+
+def typed_operand(field, value):
+    """Convert a filter value to what ``typed_column(field.field_type)`` stores."""
+    if value is None or isinstance(value, (dict, list)):
+        raise FilterError(f"Field {field.id}: expected a single value, got {json.dumps(value)}.")
+    column = typed_column(field.field_type)
+    typed = typed_values(field.field_type, value)[column]
+    if typed is None:
+        kind = "a number" if column == "value_number" else "a date (YYYY-MM-DD)"
+        raise FilterError(f"Field {field.id}: {json.dumps(value)} is not {kind}.")
+    return typed
+
+
+def text_operand(value):
+    if value is None or isinstance(value, (dict, list)):
+        raise FilterError(f"Expected a text value, got {json.dumps(value)}.")
+    return str(value).strip().lower()
+
+
+def condition_values(field, op, value):
+    """The EmployeeFieldValue rows of ``field`` satisfying the condition (negation aside)."""
+    values = EmployeeFieldValue.objects.filter(field_id=field.id)
+    column = typed_column(field.field_type)
+    if op in ("eq", "ne"):
+        return values.filter(**{column: typed_operand(field, value)})
+    if op == "in":
+        if not isinstance(value, list) or not value or len(value) > MAX_IN_VALUES:
+            raise FilterError(f"Field {field.id}: in takes a list of 1 to {MAX_IN_VALUES} values.")
+        return values.filter(**{f"{column}__in": [typed_operand(field, item) for item in value]})
+    if op == "prefix":
+        prefix = text_operand(value)
+        # A range rather than LIKE, so the (field, value_text) index applies.
+        return values.filter(value_text__gte=prefix, value_text__lt=prefix + "\U0010ffff")
+    if op == "contains":
+        return filter_contains(values, text_operand(value))
+    if op == "range":
+        if not isinstance(value, list) or len(value) != 2 or value == [None, None]:
+            raise FilterError(f"Field {field.id}: range takes [low, high]; one end may be null.")
+        low, high = value
+        if low is not None:
+            values = values.filter(**{f"{column}__gte": typed_operand(field, low)})
+        if high is not None:
+            values = values.filter(**{f"{column}__lte": typed_operand(field, high)})
+        return values
+    if op == "empty":
+        return values.filter(value_text__gt="")
+    if op == "match":
+        lookup = typed_lookup(field.field_type, text_operand(value))
+        if "value_text__contains" in lookup:
+            return filter_contains(values, lookup["value_text__contains"])
+        return values.filter(**lookup)
+    raise FilterError(f"Unknown operator {op!r}; use one of {', '.join(FILTER_OPERATORS)}.")
+
+
+def compile_condition(condition, fields_by_id):
+    try:
+        field = fields_by_id[int(condition.get("field"))]
+    except (KeyError, TypeError, ValueError):
+        raise FilterError(f"Unknown field {json.dumps(condition.get('field'))} for this form.")
+    op = condition.get("op", "eq")
+    matching = Q(id__in=condition_values(field, op, condition.get("value")).values("employee_id"))
+    if op == "ne" or (op == "empty" and condition.get("value", True) is not False):
+        return ~matching
+    return matching
+
+
+def compile_filter(expression, fields):
+    """Compile a filter expression over ``fields`` into a Q for an Employee queryset."""
+    fields_by_id = {field.id: field for field in fields}
+    conditions = 0
+
+    def compile_node(node, depth):
+        nonlocal conditions
+        if depth > MAX_FILTER_DEPTH:
+            raise FilterError(f"filter nests deeper than {MAX_FILTER_DEPTH} levels.")
+        if isinstance(node, list):
+            node = {"and": node}
+        if not isinstance(node, dict):
+            raise FilterError("Each filter node must be an object or a list.")
+        if "field" in node:
+            conditions += 1
+            if conditions > MAX_FILTER_CONDITIONS:
+                raise FilterError(f"filter has more than {MAX_FILTER_CONDITIONS} conditions.")
+            return compile_condition(node, fields_by_id)
+        if "not" in node:
+            return ~compile_node(node["not"], depth + 1)
+        for connector in ("and", "or"):
+            if connector in node:
+                children = node[connector]
+                if not isinstance(children, list) or not children:
+                    raise FilterError(f"{connector} takes a non-empty list.")
+                compiled = [compile_node(child, depth + 1) for child in children]
+                combined = compiled[0]
+                for q in compiled[1:]:
+                    combined = combined & q if connector == "and" else combined | q
+                return combined
+        raise FilterError("Each filter node needs field, and, or or not.")
+
+    return compile_node(expression, 0)
+
+
+def filter_employees(employees, fields, params):
+    """Apply the employee list filters in ``params``.
+
+    ``field_<id>=<value>`` boxes (ids outside ``fields`` are ignored) behave
+    as ``match`` conditions and are and-ed with the ``filter`` expression.
+    Raises FilterError for an invalid expression.
+    """
+    field_ids = {str(field.id) for field in fields}
+    conditions = [
+        {"field": int(key.split("_")[1]), "op": "match", "value": value}
+        for key, value in params.items()
+        if key.startswith("field_") and str(value).strip() and key.split("_")[1] in field_ids
+    ]
+    if params.get("filter"):
+        conditions.append(parse_filter(params["filter"]))
+    if not conditions:
+        return employees
+    return employees.filter(compile_filter(conditions, fields))
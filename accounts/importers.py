@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+
+from .exporters import FORMULA_PREFIXES
+from .services import create_employees, get_fields_by_id, validate_field_value
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+class ImportFileError(ValueError):
+    """The file could not be decoded or parsed; the message is safe to show to the client."""
+
+
+def detect_format(filename):
+    if filename and filename.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+def open_text(binary_file):
+    """Wrap a binary file (upload or on-disk) for line-by-line text reads."""
+    return io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+
+
+def unescape_formula(value):
+    """Undo the exporter's ``'`` prefix on cells that would otherwise be spreadsheet formulas."""
+    if isinstance(value, str) and value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def iter_csv_rows(text_file):
+    reader = csv.DictReader(text_file)
+    for row in reader:
+        yield reader.line_num, {unescape_formula(column): unescape_formula(value) for column, value in row.items()}, None
+
+
+def iter_jsonl_rows(text_file):
+    for line_num, line in enumerate(text_file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_num, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_num, None, "Each line must be a JSON object."
+            continue
+        yield line_num, row, None
+
+
+class ColumnMapper:
+    """Resolve import column names to DynamicField ids.
+
+    A column matches a field by id (``12`` or ``field_12``) or by label,
+    case-insensitively. Resolutions are memoised so JSONL rows with varying
+    keys stay cheap.
+    """
+
+    def __init__(self, fields_by_id):
+        self.fields_by_id = fields_by_id
+        self.by_label = {field.label.strip().lower(): field_id for field_id, field in fields_by_id.items()}
+        self.resolved = {}
+        self.unknown = set()
+
+    def resolve(self, column):
+        if column not in self.resolved:
+            key = str(column).strip().lower()
+            field_id = self.by_label.get(key)
+            if field_id is None:
+                raw_id = key[len("field_"):] if key.startswith("field_") else key
+                if raw_id.isdigit() and int(raw_id) in self.fields_by_id:
+                    field_id = int(raw_id)
+            if field_id is None:
+                self.unknown.add(str(column))
+            self.resolved[column] = field_id
+        return self.resolved[column]
+
+
+def validate_row(fields_by_id, mapper, row):
+    """Turn a parsed row into ``{field_id: value}``, returning ``(values, errors)``."""
+    values = {}
+    for column, value in row.items():
+        if column is None:
+            continue
+        field_id = mapper.resolve(column)
+        if field_id is not None:
+            values[field_id] = "" if value is None else str(value)
+
+    errors = {}
+    for field_id, field in fields_by_id.items():
+        error = validate_field_value(field, values.get(field_id))
+        if error:
+            errors[field.label] = error
+    return values, errors
+
+
+def import_employees(form, text_file, file_format="csv", batch_size=DEFAULT_BATCH_SIZE):
+    """Stream rows from ``text_file`` into employees of ``form``.
+
+    Rows are validated against the form schema; valid rows are written in
+    batches of ``batch_size``, one transaction per batch, and invalid rows are
+    skipped and reported. Only the current batch is held in memory.
+
+    Raises ImportFileError if the file is not UTF-8 or not valid CSV; the
+    batches written before that point are kept.
+    """
+    fields_by_id = get_fields_by_id(form)
+    mapper = ColumnMapper(fields_by_id)
+    rows = iter_jsonl_rows(text_file) if file_format == "jsonl" else iter_csv_rows(text_file)
+    report = {"created": 0, "failed": 0, "errors": [], "unknown_columns": []}
+
+    def fail(line_num, errors):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": line_num, "errors": errors})
+
+    batch = []
+    try:
+        for line_num, row, parse_error in rows:
+            if parse_error:
+                fail(line_num, {"row": parse_error})
+                continue
+            values, errors = validate_row(fields_by_id, mapper, row)
+            if errors:
+                fail(line_num, errors)
+                continue
+            batch.append(values)
+            if len(batch) >= batch_size:
+                report["created"] += len(create_employees(form, fields_by_id, batch))
+                batch = []
+    except UnicodeDecodeError:
+        raise ImportFileError(f"The file is not UTF-8 encoded ({report['created']} employees were imported before the error).")
+    except csv.Error as e:
+        raise ImportFileError(f"Malformed CSV: {e} ({report['created']} employees were imported before the error).")
+    if batch:
+        report["created"] += len(create_employees(form, fields_by_id, batch))
+
+    report["unknown_columns"] = sorted(mapper.unknown)
+    return report
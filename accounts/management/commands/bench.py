@@ -0,0 +1,66 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from accounts.benchmarks import BENCH_PASSWORD, BENCHMARKS, BenchContext, login_throughput, run_suite
+from accounts.models import DynamicForm
+
+BENCH_USERNAME = "bench"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time and count the queries of the form/employee hot paths and write the results as JSON. "
+        "Create benchmarks write employees, so run it against a seeded scratch database (see seed_bench)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--form", type=int, help="Form to benchmark; defaults to the one with most employees.")
+        parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks.")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+        parser.add_argument("--logins", type=int, default=0, help="Also measure login throughput with this many logins.")
+        parser.add_argument("--login-concurrency", type=int, default=16)
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be positive.")
+
+        forms = DynamicForm.objects.annotate(employee_count=Count("employees"))
+        if options["form"]:
+            form = forms.filter(id=options["form"]).first()
+        else:
+            form = forms.filter(employee_count__gt=0).order_by("-employee_count").first()
+        if form is None or form.employee_count == 0:
+            raise CommandError("No form with employees to benchmark; run seed_bench first.")
+
+        user, _ = get_user_model().objects.get_or_create(username=BENCH_USERNAME)
+        if not user.check_password(BENCH_PASSWORD):
+            user.set_password(BENCH_PASSWORD)
+            user.save()
+
+        # Allows the test client's "testserver" host, as under the test runner.
+        setup_test_environment()
+        try:
+            results = run_suite(BenchContext(form, user), options["only"] or list(BENCHMARKS), options["repeat"])
+            if options["logins"] > 0:
+                results["login_throughput"] = login_throughput(user.username, options["logins"], options["login_concurrency"])
+        finally:
+            teardown_test_environment()
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+            for name, result in results["results"].items():
+                self.stdout.write(f"{name:<24} {result['median_ms']:>10.2f} ms {result['queries']:>4} queries")
+            for variant in ("sync", "async"):
+                if "login_throughput" in results:
+                    result = results["login_throughput"][variant]
+                    self.stdout.write(f"{'login_' + variant:<24} {result['logins_per_second']:>10.2f} /s  {result['rejected']} rejected")
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.exporters import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_employees
+from accounts.filters import FilterError, filter_employees
+from accounts.models import DynamicForm, Employee
+
+
+class Command(BaseCommand):
+    help = "Stream the employees of a dynamic form to CSV or JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("form_id", type=int)
+        parser.add_argument("-o", "--output", help="Output file, defaults to stdout.")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--filter", action="append", default=[], metavar="field_<id>=<value>",
+            help="Same field filters as the employee list, or filter=<expression>; may be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            form = DynamicForm.objects.get(id=options["form_id"])
+        except DynamicForm.DoesNotExist:
+            raise CommandError(f"Form {options['form_id']} does not exist.")
+
+        params = dict(item.split("=", 1) for item in options["filter"] if "=" in item)
+        fields = list(form.fields.all())
+        try:
+            employees = filter_employees(Employee.objects.filter(form=form), fields, params)
+        except FilterError as e:
+            raise CommandError(str(e))
+        chunks = export_employees(employees, fields, options["format"], options["gzip"], options["chunk_size"])
+
+        if options["output"]:
+            mode = "wb" if options["gzip"] else "w"
+            with open(options["output"], mode, **({} if options["gzip"] else {"newline": ""})) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        elif options["gzip"]:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import delete_variant_files, process_profile_picture, variant_sizes
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Generate the resized variants of existing profile pictures."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Regenerate pictures that already have variants")
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_picture="").exclude(profile_picture__isnull=True).order_by("id")
+        expected = sorted(str(size) for size in variant_sizes())
+        processed = 0
+        for user_id, name, variants in users.values_list("id", "profile_picture", "profile_picture_variants").iterator():
+            if not options["all"] and sorted((variants or {}).get("sizes", {})) == expected:
+                continue
+            if options["all"]:
+                delete_variant_files(variants)
+                User.objects.filter(id=user_id).update(profile_picture_variants={})
+            process_profile_picture(user_id, name)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} profile pictures."))
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, ImportFileError, detect_format, import_employees, open_text
+from accounts.models import DynamicForm
+
+
+class Command(BaseCommand):
+    help = "Import employees into a dynamic form from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("form_id", type=int)
+        parser.add_argument("file")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            form = DynamicForm.objects.get(id=options["form_id"])
+        except DynamicForm.DoesNotExist:
+            raise CommandError(f"Form {options['form_id']} does not exist.")
+
+        file_format = options["format"] or detect_format(options["file"])
+        try:
+            with open(options["file"], "rb") as f:
+                report = import_employees(form, open_text(f), file_format, options["batch_size"])
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        for error in report["errors"]:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        if report["unknown_columns"]:
+            self.stderr.write(f"Ignored unknown columns: {', '.join(report['unknown_columns'])}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {report['created']} employees, {report['failed']} rows failed."))
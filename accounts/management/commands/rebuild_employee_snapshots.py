@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from accounts.models import Employee
+from accounts.queue import enqueue
+from accounts.services import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-employee JSON snapshot from the field value table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--form", type=int, help="Only rebuild employees of this form.")
+        parser.add_argument(
+            "--stale", action="store_true",
+            help="Only rebuild snapshots built against an older form schema version.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--queue", action="store_true", help="Queue the rebuild for run_workers instead.")
+
+    def handle(self, *args, **options):
+        if options["queue"]:
+            queued = enqueue("snapshots.rebuild", form_id=options["form"], stale=options["stale"])
+            self.stdout.write(self.style.SUCCESS(f"Queued task {queued.id}."))
+            return
+
+        employees = Employee.objects.all()
+        if options["form"]:
+            employees = employees.filter(form_id=options["form"])
+        if options["stale"]:
+            employees = employees.filter(schema_version__lt=F("form__schema_version"))
+
+        rebuilt = rebuild_snapshots(employees, options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} employee snapshots."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from accounts.queue import enqueue
+from accounts.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text index over employee field values."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--queue", action="store_true", help="Queue the rebuild for run_workers instead.")
+
+    def handle(self, *args, **options):
+        if options["queue"]:
+            queued = enqueue("search.rebuild_index", database=options["database"])
+            self.stdout.write(self.style.SUCCESS(f"Queued task {queued.id}."))
+            return
+        if rebuild_index(connections[options["database"]]):
+            self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                "Full-text search is not supported on this database; text filters use LIKE."
+            ))
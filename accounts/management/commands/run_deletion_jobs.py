@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from accounts.deletions import start_job
+from accounts.models import DeletionJob, Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue a deletions.run_job task for every pending or running deletion job that has none queued or running "
+        "(e.g. after its task failed or was deleted); run_workers then resumes them."
+    )
+
+    def handle(self, *args, **options):
+        jobs = DeletionJob.objects.filter(status__in=["pending", "running"]).select_related("created_by").order_by("id")
+        active = Task.objects.filter(name="deletions.run_job", status__in=["queued", "running"])
+        queued = 0
+        for job in jobs:
+            if active.filter(kwargs__job_id=job.id).exists():
+                continue
+            start_job(job)
+            queued += 1
+            self.stdout.write(f"Job {job.id}: queued ({job.deleted} of {job.total} employees deleted so far).")
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} deletion jobs."))
@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts.queue import work
+
+
+class Command(BaseCommand):
+    help = "Run background task workers, one process each."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds an idle worker waits before polling again")
+        parser.add_argument("--burst", action="store_true", help="Exit once no task is runnable")
+
+    def handle(self, *args, **options):
+        stop = multiprocessing.Event()
+        kwargs = {"stop": stop, "poll_interval": options["poll_interval"], "burst": options["burst"]}
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        connections.close_all()  # children must not share the parent's connections
+
+        def start(index):
+            process = multiprocessing.Process(target=work, args=(index,), kwargs=kwargs, name=f"task-worker-{index}")
+            process.start()
+            return process
+
+        processes = [start(index) for index in range(options["workers"])]
+        self.stdout.write(f"Started {len(processes)} workers.")
+        try:
+            while any(process.is_alive() for process in processes):
+                for index, process in enumerate(processes):
+                    process.join(timeout=1)
+                    if process.exitcode and not stop.is_set():
+                        self.stderr.write(f"Worker {index} exited with {process.exitcode}, restarting it.")
+                        processes[index] = start(index)
+        except KeyboardInterrupt:
+            stop.set()
+        for process in processes:
+            process.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
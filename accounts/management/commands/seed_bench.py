@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.benchmarks import seed_forms
+
+
+class Command(BaseCommand):
+    help = "Generate dynamic forms with every field type and employees with realistic values, for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--forms", type=int, default=3)
+        parser.add_argument("--fields", type=int, default=18, help="Fields per form, cycling through every field type.")
+        parser.add_argument("--employees", type=int, default=10000, help="Employees per form.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, so runs generate the same data.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["forms"] < 0 or options["fields"] < 1 or options["employees"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--fields and --batch-size must be positive, --forms and --employees not negative.")
+
+        forms = seed_forms(
+            options["forms"], options["fields"], options["employees"],
+            seed=options["seed"], batch_size=options["batch_size"],
+        )
+        for form in forms:
+            self.stdout.write(f"Form {form.id}: {form.name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(forms)} forms with {options['fields']} fields and {options['employees']} employees each."
+        ))
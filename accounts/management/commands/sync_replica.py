@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from accounts.routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the replica file (for local primary/replica setups)."
+
+    def handle(self, *args, **options):
+        if REPLICA_ALIAS not in connections.settings:
+            raise CommandError("No replica database configured; set DATABASE_REPLICA_NAME.")
+        primary, replica = connections["default"], connections[REPLICA_ALIAS]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("sync_replica only copies SQLite databases; use the database's own replication.")
+
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']}."))
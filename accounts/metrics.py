@@ -0,0 +1,195 @@
+"""In-process request metrics in the Prometheus text format.
+
+``MetricsMiddleware`` records, per named route, the request latency, the
+number of SQL queries and the time spent in them, the response size and the
+status code. ``metrics_view`` renders them for a Prometheus scrape.
+
+The numbers are aggregated per process: with several worker processes each
+one exposes its own series, so scrape them individually (or run a single
+worker per scrape target). Streaming responses are measured up to the
+point the body starts streaming.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+UNRESOLVED_VIEW = "<unresolved>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_lock = threading.Lock()
+_db_stats = ContextVar("metrics_db_stats", default=None)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names, values):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.series = {}
+
+    def inc(self, labels, amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.series.items()):
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram(Counter):
+    """Fixed-bucket histogram; each series holds per-bucket counts, the sum and the count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self):
+        names = (*self.labelnames, "le")
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels(names, (*labels, bound))} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {series[-2]}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {series[-1]}"
+
+
+REQUESTS = Counter("django_http_requests_total", "Requests by view, method and status.", ("view", "method", "status"))
+LATENCY = Histogram(
+    "django_http_request_duration_seconds", "Request latency by view.", ("view", "method"), LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram("django_http_request_db_queries", "SQL queries per request by view.", ("view",), QUERY_COUNT_BUCKETS)
+DB_TIME = Histogram(
+    "django_http_request_db_duration_seconds", "Time spent in SQL per request by view.", ("view",), LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "django_http_response_size_bytes", "Response body size by view (sized responses only).", ("view",), SIZE_BUCKETS,
+)
+METRICS = (REQUESTS, LATENCY, DB_QUERIES, DB_TIME, RESPONSE_SIZE)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request's stats."""
+    stats = _db_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid="accounts.metrics")
+
+
+def response_size(response):
+    if not response.streaming:
+        return len(response.content)
+    length = response.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def record_request(request, response, duration, stats):
+    match = getattr(request, "resolver_match", None)
+    view = (match.url_name or match.view_name) if match else UNRESOLVED_VIEW
+    method = request.method if request.method in METHODS else "other"
+    size = response_size(response)
+    with _lock:
+        REQUESTS.inc((view, method, str(response.status_code)))
+        LATENCY.observe((view, method), duration)
+        DB_QUERIES.observe((view,), stats[0])
+        DB_TIME.observe((view,), stats[1])
+        if size is not None:
+            RESPONSE_SIZE.observe((view,), size)
+
+
+class MetricsMiddleware:
+    """Record per-view request metrics; list it first in MIDDLEWARE to time the whole stack."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = [0, 0.0]
+        token = _db_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _db_stats.reset(token)
+        record_request(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = [0, 0.0]
+        token = _db_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _db_stats.reset(token)
+        record_request(request, response, time.perf_counter() - start, stats)
+        return response
+
+
+def render_metrics():
+    lines = []
+    with _lock:
+        for metric in METRICS:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires ``Bearer <METRICS_TOKEN>`` when that setting is set."""
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token and not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
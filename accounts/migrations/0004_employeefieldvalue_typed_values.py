@@ -0,0 +1,91 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:00
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+from django.utils.dateparse import parse_date
+
+BATCH_SIZE = 2000
+
+
+def typed_values(field_type, value):
+    # A frozen copy of accounts.models.typed_values as of this migration.
+    typed = {'value_text': None, 'value_number': None, 'value_date': None}
+    if value is None:
+        return typed
+
+    value = str(value).strip()
+    typed['value_text'] = value.lower()
+
+    if field_type == 'number' and value:
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            number = None
+        if number is not None and number.is_finite():
+            typed['value_number'] = float(number)
+    elif field_type == 'date' and value:
+        try:
+            typed['value_date'] = parse_date(value)
+        except ValueError:
+            pass
+    return typed
+
+
+def backfill_typed_values(apps, schema_editor):
+    EmployeeFieldValue = apps.get_model('accounts', 'EmployeeFieldValue')
+    db_alias = schema_editor.connection.alias
+    queryset = (
+        EmployeeFieldValue.objects.using(db_alias)
+        .select_related('field')
+        .only('id', 'value', 'field__field_type')
+        .order_by('id')
+    )
+    batch = []
+    for field_value in queryset.iterator(chunk_size=BATCH_SIZE):
+        for attr, typed in typed_values(field_value.field.field_type, field_value.value).items():
+            setattr(field_value, attr, typed)
+        batch.append(field_value)
+        if len(batch) >= BATCH_SIZE:
+            EmployeeFieldValue.objects.using(db_alias).bulk_update(batch, ['value_text', 'value_number', 'value_date'])
+            batch = []
+    if batch:
+        EmployeeFieldValue.objects.using(db_alias).bulk_update(batch, ['value_text', 'value_number', 'value_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_employee_employeefieldvalue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeefieldvalue',
+            name='value_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='employeefieldvalue',
+            name='value_number',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='employeefieldvalue',
+            name='value_text',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='employeefieldvalue',
+            index=models.Index(fields=['field', 'value_text'], name='fieldvalue_field_text_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeefieldvalue',
+            index=models.Index(fields=['field', 'value_number'], name='fieldvalue_field_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeefieldvalue',
+            index=models.Index(fields=['field', 'value_date'], name='fieldvalue_field_date_idx'),
+        ),
+        migrations.RunPython(backfill_typed_values, migrations.RunPython.noop),
+    ]
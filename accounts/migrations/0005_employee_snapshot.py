@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def backfill_snapshots(apps, schema_editor):
+    Employee = apps.get_model('accounts', 'Employee')
+    EmployeeFieldValue = apps.get_model('accounts', 'EmployeeFieldValue')
+    db_alias = schema_editor.connection.alias
+
+    def flush(batch):
+        data = {employee.id: {} for employee in batch}
+        values = EmployeeFieldValue.objects.using(db_alias).filter(employee_id__in=list(data)).order_by('id')
+        for employee_id, field_id, value in values.values_list('employee_id', 'field_id', 'value'):
+            data[employee_id][str(field_id)] = value
+        for employee in batch:
+            employee.data = data[employee.id]
+            employee.schema_version = 1
+        Employee.objects.using(db_alias).bulk_update(batch, ['data', 'schema_version'])
+
+    batch = []
+    for employee in Employee.objects.using(db_alias).only('id').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        batch.append(employee)
+        if len(batch) >= BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_employeefieldvalue_typed_values'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamicform',
+            name='schema_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='data',
+            field=models.JSONField(blank=True, default=dict, help_text='Snapshot of the field values, keyed by field id.'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='schema_version',
+            field=models.PositiveIntegerField(default=0, help_text='Form schema version the snapshot was built against.'),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_employee_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dynamicform',
+            index=models.Index(fields=['created_at', 'id'], name='form_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['form', 'created_at', 'id'], name='employee_form_created_id_idx'),
+        ),
+    ]
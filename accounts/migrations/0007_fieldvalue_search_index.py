@@ -0,0 +1,60 @@
+from django.db import DatabaseError, migrations
+
+# The SQL is frozen here; accounts.search holds the live copy.
+CREATE_STATEMENTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fieldvalue_fts USING fts5(
+        value_text, content='accounts_employeefieldvalue', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fieldvalue_fts_ai AFTER INSERT ON accounts_employeefieldvalue BEGIN
+        INSERT INTO accounts_fieldvalue_fts(rowid, value_text) VALUES (new.id, new.value_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fieldvalue_fts_ad AFTER DELETE ON accounts_employeefieldvalue BEGIN
+        INSERT INTO accounts_fieldvalue_fts(accounts_fieldvalue_fts, rowid, value_text)
+        VALUES ('delete', old.id, old.value_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fieldvalue_fts_au AFTER UPDATE OF value_text ON accounts_employeefieldvalue
+    BEGIN
+        INSERT INTO accounts_fieldvalue_fts(accounts_fieldvalue_fts, rowid, value_text)
+        VALUES ('delete', old.id, old.value_text);
+        INSERT INTO accounts_fieldvalue_fts(rowid, value_text) VALUES (new.id, new.value_text);
+    END""",
+    "INSERT INTO accounts_fieldvalue_fts(accounts_fieldvalue_fts) VALUES ('rebuild')",
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS accounts_fieldvalue_fts_ai",
+    "DROP TRIGGER IF EXISTS accounts_fieldvalue_fts_ad",
+    "DROP TRIGGER IF EXISTS accounts_fieldvalue_fts_au",
+    "DROP TABLE IF EXISTS accounts_fieldvalue_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Other backends, and SQLite builds without FTS5, search with LIKE.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            for statement in CREATE_STATEMENTS:
+                cursor.execute(statement)
+    except DatabaseError:
+        pass
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in DROP_STATEMENTS:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
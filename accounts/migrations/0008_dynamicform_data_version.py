@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_fieldvalue_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamicform',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='Bumped on every employee write.'),
+        ),
+    ]
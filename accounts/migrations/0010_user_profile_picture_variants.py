@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_deletionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized copies of the picture (see accounts.avatars).'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_task'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeefieldvalue',
+            index=models.Index(fields=['employee', 'field'], name='fieldvalue_employee_field_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def normalize_checkbox_text(apps, schema_editor):
+    # Store checkbox selections as "opt,opt" (no spaces around the commas) in value_text.
+    EmployeeFieldValue = apps.get_model('accounts', 'EmployeeFieldValue')
+    db_alias = schema_editor.connection.alias
+    queryset = (
+        EmployeeFieldValue.objects.using(db_alias)
+        .filter(field__field_type='checkbox', value_text__isnull=False)
+        .only('id', 'value_text')
+        .order_by('id')
+    )
+    batch = []
+    for field_value in queryset.iterator(chunk_size=BATCH_SIZE):
+        normalized = ','.join(part.strip() for part in field_value.value_text.split(','))
+        if normalized == field_value.value_text:
+            continue
+        field_value.value_text = normalized
+        batch.append(field_value)
+        if len(batch) >= BATCH_SIZE:
+            EmployeeFieldValue.objects.using(db_alias).bulk_update(batch, ['value_text'])
+            batch = []
+    if batch:
+        EmployeeFieldValue.objects.using(db_alias).bulk_update(batch, ['value_text'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_fieldvalue_employee_field_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_checkbox_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def clear_infinite_numbers(apps, schema_editor):
+    # Values like 1e400 were stored as inf, which JSON (and the aggregations) cannot represent.
+    EmployeeFieldValue = apps.get_model('accounts', 'EmployeeFieldValue')
+    EmployeeFieldValue.objects.using(schema_editor.connection.alias).filter(
+        value_number__in=[float('inf'), float('-inf')]
+    ).update(value_number=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_normalize_checkbox_value_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_infinite_numbers, migrations.RunPython.noop),
+    ]
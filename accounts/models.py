@@ -1,5 +1,10 @@
+import math
+from decimal import Decimal, InvalidOperation
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 FIELD_TYPES = [
     ("text", "Text"),
@@ -13,9 +18,71 @@ FIELD_TYPES = [
     ("checkbox", "Checkbox"),
 ]
 
+NUMBER_FIELD_TYPES = {"number"}
+DATE_FIELD_TYPES = {"date"}
+CHECKBOX_FIELD_TYPES = {"checkbox"}
+
+
+def typed_values(field_type, value):
+    """Return the typed shadow columns for a raw value of the given field type.
+
+    Checkbox selections are stored as ``opt,opt`` with no spaces around the
+    commas, so a single option can be matched with ``LIKE``.
+    """
+    typed = {"value_text": None, "value_number": None, "value_date": None}
+    if value is None:
+        return typed
+
+    value = str(value).strip()
+    if field_type in CHECKBOX_FIELD_TYPES:
+        value = ",".join(part.strip() for part in value.split(","))
+    typed["value_text"] = value.lower()
+
+    if field_type in NUMBER_FIELD_TYPES and value:
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            number = None
+        # Finite decimals such as 1e400 still overflow to inf as floats.
+        if number is not None and number.is_finite() and math.isfinite(float(number)):
+            typed["value_number"] = float(number)
+    elif field_type in DATE_FIELD_TYPES and value:
+        try:
+            typed["value_date"] = parse_date(value)
+        except ValueError:
+            pass
+    return typed
+
+
+def typed_lookup(field_type, value):
+    """Build the EmployeeFieldValue lookup used to match a filter value.
+
+    Number and date filters that parse are matched exactly on their typed
+    column; everything else is a case-insensitive substring match on the
+    normalized text column.
+    """
+    typed = typed_values(field_type, value)
+    if typed["value_number"] is not None:
+        return {"value_number": typed["value_number"]}
+    if typed["value_date"] is not None:
+        return {"value_date": typed["value_date"]}
+    return {"value_text__contains": typed["value_text"]}
+
+
 class User(AbstractUser):
     phone = models.CharField(max_length=15, blank=True, null=True)
     profile_picture = models.ImageField(upload_to="profiles/", blank=True, null=True)
+    profile_picture_variants = models.JSONField(
+        default=dict, blank=True, editable=False, help_text="Resized copies of the picture (see accounts.avatars)."
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # The stored picture, so saving can spot a new upload without re-reading the row (see signals).
+        if "profile_picture" in user.__dict__:
+            user._stored_profile_picture = user.__dict__["profile_picture"] or ""
+        return user
 
     def __str__(self):
         return self.username
@@ -26,9 +93,14 @@ class DynamicForm(models.Model):
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    schema_version = models.PositiveIntegerField(default=1, editable=False)
+    data_version = models.PositiveBigIntegerField(default=0, editable=False, help_text="Bumped on every employee write.")
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="form_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -54,6 +126,13 @@ class DynamicField(models.Model):
 class Employee(models.Model):
     form = models.ForeignKey(DynamicForm, on_delete=models.CASCADE, related_name="employees")
     created_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(default=dict, blank=True, help_text="Snapshot of the field values, keyed by field id.")
+    schema_version = models.PositiveIntegerField(default=0, help_text="Form schema version the snapshot was built against.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["form", "created_at", "id"], name="employee_form_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"Employee #{self.id} (Form: {self.form.name})"
@@ -63,6 +142,90 @@ class EmployeeFieldValue(models.Model):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="field_values")
     field = models.ForeignKey(DynamicField, on_delete=models.CASCADE)
     value = models.TextField(blank=True, null=True)
+    value_text = models.TextField(blank=True, null=True, editable=False)
+    value_number = models.FloatField(blank=True, null=True, editable=False)
+    value_date = models.DateField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["field", "value_text"], name="fieldvalue_field_text_idx"),
+            models.Index(fields=["field", "value_number"], name="fieldvalue_field_number_idx"),
+            models.Index(fields=["field", "value_date"], name="fieldvalue_field_date_idx"),
+            # Per-employee lookups of one field, e.g. the sort_value subquery
+            models.Index(fields=["employee", "field"], name="fieldvalue_employee_field_idx"),
+        ]
+
+    def populate_typed_values(self, field_type=None):
+        """Fill the typed shadow columns from ``value``.
+
+        Pass ``field_type`` when the caller already knows it (e.g. before a
+        ``bulk_create``) to avoid loading the related field.
+        """
+        if field_type is None:
+            field_type = self.field.field_type
+        for attr, typed in typed_values(field_type, self.value).items():
+            setattr(self, attr, typed)
+
+    def save(self, *args, **kwargs):
+        self.populate_typed_values()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "value" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "value_text", "value_number", "value_date"}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.field.label}: {self.value} - {self.employee.id}"
+
+
+class DeletionJob(models.Model):
+    """A chunked background delete of a form's employees, or of a whole form."""
+
+    KIND_CHOICES = [("employees", "Employees"), ("form", "Form")]
+    STATUS_CHOICES = [("pending", "Pending"), ("running", "Running"), ("done", "Done"), ("failed", "Failed")]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    form_id = models.BigIntegerField(help_text="Plain id rather than a foreign key: a form job deletes the form itself.")
+    filters = models.JSONField(default=dict, blank=True, help_text="employee_list field_<id> filters.")
+    max_employee_id = models.BigIntegerField(null=True, blank=True, help_text="Employees created after the job are kept.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    total = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Delete {self.kind} of form {self.form_id} ({self.status})"
+
+
+class Task(models.Model):
+    """A unit of background work for ``manage.py run_workers`` (see accounts.queue)."""
+
+    STATUS_CHOICES = [("queued", "Queued"), ("running", "Running"), ("done", "Done"), ("failed", "Failed")]
+
+    name = models.CharField(max_length=100, help_text="Registered task name.")
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    timeout = models.PositiveIntegerField(help_text="Seconds a worker may go without reporting progress before the task is retried.")
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not claimed before this time (retry backoff).")
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"], name="task_claim_idx")]
 
     def __str__(self):
-        return f"{self.field.label}: {self.value} - {self.employee.id}"
\ No newline at end of file
+        return f"{self.name} #{self.id} ({self.status})"
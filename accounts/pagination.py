@@ -0,0 +1,172 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .sorting import dump_sort_value, load_sort_value, seek_after, sort_employees
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on ``(created_at, id)``.
+
+    Each page is fetched with a ``WHERE (created_at, id) > cursor`` seek
+    instead of an OFFSET, so deep pages cost the same as the first one. The
+    cursor is an opaque token encoding the last row of the previous page.
+    """
+
+    ordering = ("created_at", "id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        default = getattr(settings, "API_PAGE_SIZE", 50)
+        maximum = getattr(settings, "API_MAX_PAGE_SIZE", 500)
+        try:
+            page_size = int(request.GET.get(self.page_size_query_param, default))
+        except ValueError:
+            page_size = default
+        return max(1, min(page_size, maximum))
+
+    @staticmethod
+    def row_value(row, name):
+        """``name`` of a page row: a model instance or a ``.values()`` dict."""
+        return row[name] if isinstance(row, dict) else getattr(row, name)
+
+    def encode_cursor(self, created_at, pk):
+        payload = json.dumps([created_at.isoformat(), pk]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        return self.parse_cursor(request.GET.get(self.cursor_query_param))
+
+    def parse_cursor(self, token):
+        """Decode a cursor token into ``(created_at, id)``; None when absent."""
+        if not token:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, pk = json.loads(payload)
+            created_at = parse_datetime(created_at)
+            if created_at is None or not isinstance(pk, int):
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def seek(self, created_at, pk):
+        op = "lt" if self.ordering[0].startswith("-") else "gt"
+        return Q(**{f"created_at__{op}": created_at}) | Q(created_at=created_at, **{f"id__{op}": pk})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.seek(*position))
+
+        results = list(queryset[:page_size + 1])
+        self.next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            last = results[-1]
+            self.next_cursor = self.encode_cursor(self.row_value(last, "created_at"), self.row_value(last, "id"))
+        return results
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "first": self.get_first_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class EmployeeKeysetPagination(KeysetPagination):
+    """Employees by ``(created_at, id)``, or by a field when the view sets ``sort``.
+
+    Sorted pages (see accounts.sorting) seek on ``(sort_value, id)``; their
+    cursor also records the sort, so it can't be replayed against another.
+    """
+
+    ordering = ("created_at", "id")
+
+    def encode_sort_cursor(self, sort, row):
+        payload = json.dumps([sort.param, dump_sort_value(self.row_value(row, "sort_value")), self.row_value(row, "id")]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def parse_sort_cursor(self, token, sort):
+        """Decode a sorted cursor into ``(sort_value, id)``; None when absent."""
+        if not token:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            param, value, pk = json.loads(payload)
+            if param != sort.param or not isinstance(pk, int):
+                raise ValueError
+            return load_sort_value(sort, value), pk
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def sorted_page(self, queryset, token, sort):
+        """The queryset of the page after ``token``, sorted; slice it to the page size plus one."""
+        queryset = sort_employees(queryset, sort)
+        position = self.parse_sort_cursor(token, sort)
+        if position is not None:
+            queryset = queryset.filter(seek_after(sort, *position))
+        return queryset
+
+    def page_queryset(self, queryset, token, sort=None):
+        """The rows after ``token`` in page order, by ``sort`` when given; slice to the page size plus one."""
+        if sort is not None:
+            return self.sorted_page(queryset, token, sort)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.parse_cursor(token)
+        if position is not None:
+            queryset = queryset.filter(self.seek(*position))
+        return queryset
+
+    def cursor_after(self, row, sort=None):
+        """The cursor of the page following ``row``."""
+        if sort is not None:
+            return self.encode_sort_cursor(sort, row)
+        return self.encode_cursor(self.row_value(row, "created_at"), self.row_value(row, "id"))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        sort = getattr(view, "sort", None)
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = self.page_queryset(queryset, request.GET.get(self.cursor_query_param), sort)
+        results = list(queryset[:page_size + 1])
+        self.next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.next_cursor = self.cursor_after(results[-1], sort)
+        return results
+
+
+class FormKeysetPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,81 @@
+"""Password verification off the request thread, for the async login views.
+
+PBKDF2 costs tens of milliseconds of CPU per check, so hash checks run on a
+bounded thread pool (hashlib releases the GIL while hashing). When
+``LOGIN_MAX_PENDING`` checks are already running or queued, new logins are
+rejected straight away with ``PoolSaturated`` instead of piling up behind
+them.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+def call_with_connection_checks(func, *args):
+    """Run ``func`` on a pool thread, dropping its broken or expired DB connections before and after.
+
+    Django only does this around requests, and pool threads keep their own
+    connections for as long as they live.
+    """
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+class HashPool:
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise PoolSaturated
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, call_with_connection_checks, func, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+
+_pool = None
+
+
+def hash_pool():
+    global _pool
+    if _pool is None:
+        workers = getattr(settings, "LOGIN_HASH_WORKERS", None) or os.cpu_count() or 2
+        _pool = HashPool(workers, getattr(settings, "LOGIN_MAX_PENDING", None) or workers * 4)
+    return _pool
+
+
+async def averify_credentials(request, username, password):
+    """Return the user ``authenticate()`` accepts for ``username``/``password``, or None.
+
+    The whole ``authenticate()`` call runs on the pool, so the configured
+    backends, ``user_login_failed`` and hash upgrades behave as in the sync
+    views. Raises PoolSaturated when the pool is full.
+    """
+    return await hash_pool().run(partial(authenticate, request, username=username, password=password))
@@ -0,0 +1,166 @@
+"""A database-backed task queue, so heavy work needs no broker.
+
+Functions registered with ``@task`` are queued as ``Task`` rows by
+``enqueue`` once the surrounding transaction commits, and run by the worker
+processes of ``manage.py run_workers``. A worker claims a task with a
+conditional UPDATE, so two workers never both take it, and holds it for the
+task's ``timeout`` seconds; reporting progress extends that. A task whose
+worker died or stalled becomes claimable again when the timeout lapses.
+Failed attempts are retried with exponential backoff up to ``max_attempts``.
+
+With ``TASKS_ALWAYS_EAGER`` tasks run in-process on commit instead.
+"""
+import logging
+import os
+import signal
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+DEFAULT_TIMEOUT = 300
+
+
+class TaskRun:
+    """Handed to a running task to report progress (which also keeps its claim alive)."""
+
+    def __init__(self, task, worker):
+        self.task = task
+        self.worker = worker
+
+    def progress(self, done, total=None):
+        changes = {"progress": done, "locked_until": timezone.now() + timedelta(seconds=self.task.timeout)}
+        if total is not None:
+            changes["total"] = total
+        claimed = Task.objects.filter(id=self.task.id, locked_by=self.worker, attempts=self.task.attempts)
+        claimed.update(updated_at=timezone.now(), **changes)
+
+
+def task(name, max_attempts=3, timeout=DEFAULT_TIMEOUT):
+    """Register ``func(run, **kwargs)`` as a task; ``run`` is its TaskRun."""
+    def register(func):
+        TASKS[name] = {"func": func, "max_attempts": max_attempts, "timeout": timeout}
+        return func
+    return register
+
+
+def retry_delay(attempts):
+    return getattr(settings, "TASK_RETRY_DELAY", 10) * 2 ** (attempts - 1)
+
+
+def enqueue(name, user=None, **kwargs):
+    """Queue task ``name`` with JSON-serializable ``kwargs``, returning its Task.
+
+    The task becomes visible to workers when the current transaction commits.
+    """
+    spec = TASKS[name]
+    queued = Task.objects.create(
+        name=name, kwargs=kwargs, max_attempts=spec["max_attempts"], timeout=spec["timeout"], created_by=user,
+    )
+    if getattr(settings, "TASKS_ALWAYS_EAGER", False):
+        transaction.on_commit(lambda: run_task(queued.id, "eager"))
+    return queued
+
+
+def claimable(now):
+    expired = Q(status="running", locked_until__lt=now)
+    return Q(status="queued", run_after__lte=now) | expired
+
+
+def take(task_id, timeout, worker):
+    """Claim ``task_id`` for ``worker`` if it is still claimable; returns whether it was."""
+    now = timezone.now()
+    return Task.objects.filter(claimable(now), id=task_id).update(
+        status="running", locked_by=worker, locked_until=now + timedelta(seconds=timeout),
+        attempts=F("attempts") + 1, started_at=now, updated_at=now,
+    ) == 1
+
+
+def claim(worker):
+    """Claim the oldest runnable task for ``worker``, or return None."""
+    candidates = Task.objects.filter(claimable(timezone.now())).order_by("run_after", "id").values_list("id", "timeout")
+    for task_id, timeout in candidates[:10]:
+        if take(task_id, timeout, worker):
+            return Task.objects.get(id=task_id)
+    return None
+
+
+def finish(claimed, worker, **changes):
+    """Record the outcome of an attempt, unless another worker has since reclaimed the task."""
+    now = timezone.now()
+    Task.objects.filter(id=claimed.id, locked_by=worker, attempts=claimed.attempts).update(
+        locked_by="", locked_until=None, updated_at=now, **changes,
+    )
+
+
+def execute(claimed, worker):
+    spec = TASKS.get(claimed.name)
+    if spec is None:
+        finish(claimed, worker, status="failed", error=f"Unknown task {claimed.name!r}", finished_at=timezone.now())
+        return
+    if claimed.attempts > claimed.max_attempts:
+        finish(claimed, worker, status="failed", error=claimed.error or "The worker stopped reporting progress.", finished_at=timezone.now())
+        return
+
+    try:
+        result = spec["func"](TaskRun(claimed, worker), **claimed.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Task %s #%s failed (attempt %s)", claimed.name, claimed.id, claimed.attempts)
+        if claimed.attempts < claimed.max_attempts:
+            run_after = timezone.now() + timedelta(seconds=retry_delay(claimed.attempts))
+            finish(claimed, worker, status="queued", error=error, run_after=run_after)
+        else:
+            finish(claimed, worker, status="failed", error=error, finished_at=timezone.now())
+        return
+    finish(claimed, worker, status="done", result=result, error="", finished_at=timezone.now())
+
+
+def run_task(task_id, worker):
+    """Claim and run one specific task now (used by the eager mode)."""
+    timeout = Task.objects.filter(id=task_id).values_list("timeout", flat=True).first()
+    if timeout is not None and take(task_id, timeout, worker):
+        execute(Task.objects.get(id=task_id), worker)
+
+
+def worker_name(index):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def work(index=0, stop=None, poll_interval=1.0, burst=False):
+    """The loop of one worker process: claim, run, repeat until ``stop`` is set.
+
+    With ``burst`` the worker exits once no task is runnable.
+    """
+    import django
+    django.setup()  # a no-op when forked; spawned processes start from scratch
+    if stop is not None:
+        # The parent turns Ctrl+C/SIGTERM into ``stop``, so the current task can finish.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    worker = worker_name(index)
+    logger.info("Worker %s started", worker)
+    while stop is None or not stop.is_set():
+        close_old_connections()
+        claimed = claim(worker)
+        if claimed is None:
+            if burst:
+                break
+            if stop is not None:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        execute(claimed, worker)
+    close_old_connections()
@@ -0,0 +1,53 @@
+"""A JSON renderer backed by orjson, when it is installed.
+
+orjson is optional (``pip install orjson``); without it, or when the client
+asks for indented output, the renderer is DRF's JSONRenderer. The bytes are
+the same either way: datetimes and other non-native types still go through
+DRF's encoder, and U+2028/U+2029 are escaped as DRF does.
+"""
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class OrjsonRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if not self.strict:
+            options |= orjson.OPT_SERIALIZE_NUMPY
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=options)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        return ret
+
+
+class CompactRenderer(OrjsonRenderer):
+    """The employee list APIs' compact format (see accounts.rows.compact_rows).
+
+    Selected with ``Accept: application/vnd.employees.compact+json`` or
+    ``?format=compact``; the views build the payload, this only encodes it.
+    """
+    media_type = "application/vnd.employees.compact+json"
+    format = "compact"
+
+
+def accepts_compact(request):
+    """Whether a plain Django request asks for CompactRenderer's format."""
+    if "format" in request.GET:
+        return request.GET["format"] == CompactRenderer.format
+    return CompactRenderer.media_type in request.headers.get("Accept", "")
+
+
+def dumps(data):
+    """``data`` as JSON bytes, like OrjsonRenderer (for the plain Django views)."""
+    return OrjsonRenderer().render(data)
+
+
+# renderer_classes of the list APIs
+FAST_RENDERER_CLASSES = [OrjsonRenderer, BrowsableAPIRenderer]
+EMPLOYEE_RENDERER_CLASSES = [*FAST_RENDERER_CLASSES, CompactRenderer]
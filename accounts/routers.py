@@ -0,0 +1,71 @@
+"""Primary/replica database routing.
+
+Writes always go to ``default``. Reads of the form and employee models go to
+the ``replica`` alias (when one is configured) only while a read-only view
+runs: function views opt in with ``@replica_reads`` and DRF views with
+``ReplicaReadsMixin``, and only for GET/HEAD/OPTIONS requests. Users,
+sessions and tokens are always read from the primary, so logins and
+password changes are seen straight away.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+REPLICA_MODELS = {"accounts.DynamicForm", "accounts.DynamicField", "accounts.Employee", "accounts.EmployeeFieldValue"}
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_reads(view):
+    """Route the form/employee reads of a function view to the replica on safe requests."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with use_replica(request.method in SAFE_METHODS):
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with use_replica(request.method in SAFE_METHODS):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadsMixin:
+    """``replica_reads`` for DRF views."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with use_replica(request.method in SAFE_METHODS):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and REPLICA_ALIAS in settings.DATABASES and model._meta.label in REPLICA_MODELS:
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, never migrated on its own.
+        return db != REPLICA_ALIAS
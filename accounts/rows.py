@@ -0,0 +1,87 @@
+"""Lean read path for the employee and form list APIs.
+
+Builds the same JSON as EmployeeSnapshotSerializer and DynamicFormSerializer
+from ``.values()`` rows, with each form's field metadata resolved once per
+page instead of through DRF's per-object field machinery.
+
+``compact_rows`` is the opt-in compact employee format (see
+accounts.renderers.CompactRenderer): the form's fields are listed once and
+each employee is a positional array::
+
+    {"fields": [{"field_id": 3, "field_label": "Name", "field_type": "text"}, ...],
+     "results": [[<id>, <created_at>, <value of field 3>, ...], ...]}
+
+A value the employee has no entry for is null.
+"""
+from django.utils import timezone
+
+from .models import DynamicField
+
+EMPLOYEE_COLUMNS = ("id", "form_id", "data", "created_at")
+FORM_COLUMNS = ("id", "name", "description", "created_at", "updated_at")
+FIELD_COLUMNS = ("id", "label", "field_type", "required", "options", "placeholder", "help_text", "order")
+
+
+def format_datetime(value):
+    """A datetime as DRF's DateTimeField renders it (ISO 8601, UTC as ``Z``)."""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+def employee_rows(employees, fields):
+    """EmployeeSnapshotSerializer output for rows holding EMPLOYEE_COLUMNS.
+
+    ``employees`` are dicts (from ``.values(*EMPLOYEE_COLUMNS)``); ``fields``
+    the form's fields in order.
+    """
+    columns = [(str(field.id), field.id, field.label, field.field_type) for field in fields]
+    return [
+        {
+            "id": employee["id"],
+            "form_id": employee["form_id"],
+            "fields": [
+                {"field_id": field_id, "field_label": label, "field_type": field_type, "value": data[key]}
+                for key, field_id, label, field_type in columns
+                if key in data
+            ],
+            "created_at": format_datetime(employee["created_at"]),
+        }
+        for employee in employees
+        for data in (employee["data"],)
+    ]
+
+
+def compact_rows(employees, fields):
+    """The compact format of rows holding EMPLOYEE_COLUMNS: ``fields`` once, then one array per employee."""
+    keys = [str(field.id) for field in fields]
+    return {
+        "fields": [
+            {"field_id": field.id, "field_label": field.label, "field_type": field.field_type}
+            for field in fields
+        ],
+        "results": [
+            [employee["id"], format_datetime(employee["created_at"]), *map(employee["data"].get, keys)]
+            for employee in employees
+        ],
+    }
+
+
+def form_rows(forms):
+    """DynamicFormSerializer output for rows holding FORM_COLUMNS, with one query for all their fields."""
+    fields = {}
+    values = DynamicField.objects.filter(form_id__in=[form["id"] for form in forms]).order_by("order", "id")
+    for field in values.values("form_id", *FIELD_COLUMNS):
+        fields.setdefault(field.pop("form_id"), []).append(field)
+    return [
+        {
+            "id": form["id"],
+            "name": form["name"],
+            "description": form["description"],
+            "created_at": format_datetime(form["created_at"]),
+            "updated_at": format_datetime(form["updated_at"]),
+            "fields": fields.get(form["id"], []),
+        }
+        for form in forms
+    ]
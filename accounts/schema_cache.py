@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import DynamicForm
+from .routers import use_replica
+from .rows import format_datetime
+
+
+def version_key(form_id):
+    return f"form-schema-version:{form_id}"
+
+
+def schema_key(form_id, version):
+    return f"form-schema:{form_id}:{version}"
+
+
+def schema_cache_version(schema_version, updated_at):
+    """What a cached schema is keyed on; ``updated_at`` as serialized.
+
+    Field changes bump ``schema_version`` and every form save ``updated_at``.
+    """
+    return f"{schema_version}:{updated_at}"
+
+
+def serialize_form_schema(form):
+    from .serializers import DynamicFormSerializer
+
+    return {"schema_version": form.schema_version, **DynamicFormSerializer(form).data}
+
+
+def schema_timeout():
+    return getattr(settings, "SCHEMA_CACHE_TIMEOUT", 300)
+
+
+def get_form_schema(form_id):
+    """Return the serialized form with its fields, or None if it doesn't exist.
+
+    Schemas are cached under ``(form id, schema_cache_version)``; the current
+    version of each form is itself cached, so a warm read never touches the
+    database. Writers set that pointer when they commit (see
+    ``invalidate_form_schema``); readers only ``add()`` it, so a reader that
+    loaded an older version never replaces a writer's.
+    """
+    version = cache.get(version_key(form_id))
+    if version is not None:
+        schema = cache.get(schema_key(form_id, version))
+        if schema is not None:
+            return schema
+
+    # Always from the primary: a lagging replica must not publish an old schema.
+    with use_replica(False):
+        form = DynamicForm.objects.prefetch_related("fields").filter(id=form_id).first()
+    if form is None:
+        return None
+    schema = serialize_form_schema(form)
+    version = schema_cache_version(schema["schema_version"], schema["updated_at"])
+    cache.set(schema_key(form_id, version), schema, schema_timeout())
+    if not cache.add(version_key(form_id), version, schema_timeout()):
+        cache.touch(version_key(form_id), schema_timeout())
+    return schema
+
+
+async def aget_form_schema(form_id):
+    """Async counterpart of ``get_form_schema``."""
+    version = await cache.aget(version_key(form_id))
+    if version is not None:
+        schema = await cache.aget(schema_key(form_id, version))
+        if schema is not None:
+            return schema
+
+    with use_replica(False):
+        form = await DynamicForm.objects.prefetch_related("fields").filter(id=form_id).afirst()
+    if form is None:
+        return None
+    schema = serialize_form_schema(form)
+    version = schema_cache_version(schema["schema_version"], schema["updated_at"])
+    await cache.aset(schema_key(form_id, version), schema, schema_timeout())
+    if not await cache.aadd(version_key(form_id), version, schema_timeout()):
+        await cache.atouch(version_key(form_id), schema_timeout())
+    return schema
+
+
+def publish_form_schema_version(form_id):
+    """Point the cache at the form's committed version (or drop the pointer if it is gone)."""
+    with use_replica(False):
+        current = DynamicForm.objects.filter(id=form_id).values_list("schema_version", "updated_at").first()
+    if current is None:
+        cache.delete(version_key(form_id))
+    else:
+        schema_version, updated_at = current
+        cache.set(version_key(form_id), schema_cache_version(schema_version, format_datetime(updated_at)), schema_timeout())
+
+
+def invalidate_form_schema(form_id):
+    """Publish the form's new version once the current transaction commits."""
+    transaction.on_commit(lambda: publish_form_schema_version(form_id))
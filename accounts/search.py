@@ -0,0 +1,118 @@
+"""Full-text index over ``EmployeeFieldValue.value_text``.
+
+On SQLite with FTS5 the values are mirrored into a trigram FTS5 table kept in
+sync by triggers; other backends fall back to ``LIKE`` on the text column.
+"""
+from django.db import DatabaseError, connections
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "accounts_fieldvalue_fts"
+VALUE_TABLE = "accounts_employeefieldvalue"
+MIN_FTS_TERM_LENGTH = 3  # the trigram tokenizer cannot match shorter terms
+
+CREATE_STATEMENTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        value_text, content='{VALUE_TABLE}', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {VALUE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, value_text) VALUES (new.id, new.value_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {VALUE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, value_text) VALUES ('delete', old.id, old.value_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF value_text ON {VALUE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, value_text) VALUES ('delete', old.id, old.value_text);
+        INSERT INTO {FTS_TABLE}(rowid, value_text) VALUES (new.id, new.value_text);
+    END""",
+]
+
+INDEX_OBJECTS = [FTS_TABLE, f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au"]
+
+DROP_STATEMENTS = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+_available = {}
+
+
+def create_index(connection):
+    """Create the FTS table and its triggers; returns False when unsupported."""
+    if connection.vendor != "sqlite":
+        return False
+    try:
+        with connection.cursor() as cursor:
+            for statement in CREATE_STATEMENTS:
+                cursor.execute(statement)
+    except DatabaseError:
+        return False
+    finally:
+        _available.pop(connection.alias, None)
+    return True
+
+
+def drop_index(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_STATEMENTS:
+            cursor.execute(statement)
+    _available.pop(connection.alias, None)
+
+
+def rebuild_index(connection):
+    """Repopulate the FTS table from the value table, creating it if needed."""
+    if not create_index(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def ensure_index(connection):
+    """Recreate and repopulate the index if the table or a trigger is missing.
+
+    SQLite drops the triggers whenever a migration remakes the value table
+    (any AlterField on it), after which the index silently goes stale; this
+    runs after every ``migrate``. Returns True when the index was rebuilt.
+    """
+    if connection.vendor != "sqlite" or VALUE_TABLE not in connection.introspection.table_names():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(INDEX_OBJECTS))})", INDEX_OBJECTS
+        )
+        present = {name for name, in cursor.fetchall()}
+    if present == set(INDEX_OBJECTS):
+        return False
+    return rebuild_index(connection)
+
+
+def index_available(alias="default"):
+    if alias not in _available:
+        connection = connections[alias]
+        _available[alias] = (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _available[alias]
+
+
+def fts_phrase(term):
+    return '"%s"' % term.replace('"', '""')
+
+
+def filter_contains(values, term):
+    """Restrict an EmployeeFieldValue queryset to values containing ``term``.
+
+    ``term`` is matched case-insensitively as a substring, through the FTS
+    index when it is available and the term is long enough.
+    """
+    term = term.strip().lower()
+    if len(term) >= MIN_FTS_TERM_LENGTH and index_available(values.db):
+        return values.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [fts_phrase(term)]
+        ))
+    return values.filter(value_text__contains=term)
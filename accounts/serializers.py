@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
-from .models import DynamicField, DynamicForm, Employee, EmployeeFieldValue
+from django.core.exceptions import ValidationError as DjangoValidationError
+from .avatars import avatar_url
+from .models import DeletionJob, Task, DynamicField, DynamicForm, Employee, EmployeeFieldValue
+from .services import create_employee, create_form, get_fields_by_id, resolve_field_values, update_employee_values
 
 User = get_user_model()
 
@@ -36,9 +39,16 @@ class UserLoginSerializer(serializers.Serializer):
 
 
 class UserDetailSerializer(serializers.ModelSerializer):
+    avatar_urls = serializers.SerializerMethodField()
+
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'phone', 'profile_picture']
+        fields = ['id', 'username', 'email', 'phone', 'profile_picture', 'avatar_urls']
+
+    def get_avatar_urls(self, user):
+        """Resized picture URLs by size; empty until the variants are generated."""
+        sizes = (user.profile_picture_variants or {}).get("sizes", {})
+        return {size: avatar_url(user, int(size)) for size in sizes}
 
         
 class ChangePasswordSerializer(serializers.Serializer):
@@ -112,13 +122,10 @@ class DynamicFormSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         fields_data = validated_data.pop("fields")
-        form = DynamicForm.objects.create(**validated_data)
-
         for idx, field in enumerate(fields_data, start=1):
-            order = field.pop("order", idx)
-            DynamicField.objects.create(form=form, order=order, **field)
+            field.setdefault("order", idx)
 
-        return form
+        return create_form(validated_data, fields_data)
     
 
 
@@ -147,24 +154,13 @@ class EmployeeCreateSerializer(serializers.ModelSerializer):
         except DynamicForm.DoesNotExist:
             raise serializers.ValidationError({"form_id": "Form not found."})
 
-        employee = Employee.objects.create(form=form)
-
         for field_data in fields_data:
-            field_id = field_data.get("field_id")
-            value = field_data.get("value", "")
+            field_data.setdefault("value", "")
 
-            try:
-                field = DynamicField.objects.get(id=field_id, form=form)
-            except DynamicField.DoesNotExist:
-                raise serializers.ValidationError({"field_id": f"Invalid field_id {field_id} for this form"})
-
-            EmployeeFieldValue.objects.create(
-                employee=employee,
-                field=field,
-                value=value
-            )
-
-        return employee
+        try:
+            return create_employee(form, fields_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
 
 
 class EmployeeFieldValueReadSerializer(serializers.ModelSerializer):
@@ -184,6 +180,31 @@ class EmployeeReadSerializer(serializers.ModelSerializer):
         fields = ["id", "form_id", "fields", "created_at"]
         
 
+class EmployeeSnapshotSerializer(serializers.ModelSerializer):
+    """Read an employee from its ``data`` snapshot instead of the value table.
+
+    Expects the form's fields, in order, as ``context["form_fields"]``; the
+    output matches EmployeeReadSerializer.
+    """
+    fields = serializers.SerializerMethodField(method_name="get_field_values")
+
+    class Meta:
+        model = Employee
+        fields = ["id", "form_id", "fields", "created_at"]
+
+    def get_field_values(self, obj):
+        return [
+            {
+                "field_id": field.id,
+                "field_label": field.label,
+                "field_type": field.field_type,
+                "value": obj.data[str(field.id)],
+            }
+            for field in self.context["form_fields"]
+            if str(field.id) in obj.data
+        ]
+
+
 class EmployeeFieldValueUpdateSerializer(serializers.ModelSerializer):
     field_id = serializers.IntegerField()
 
@@ -216,16 +237,44 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         fields_data = validated_data.pop("field_values", [])
+        fields_by_id = get_fields_by_id(instance.form)
 
-        for field_data in fields_data:
-            field_id = field_data.get("field_id")
-            value = field_data.get("value")
+        try:
+            values = resolve_field_values(fields_by_id, fields_data, partial=True)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
+
+        return update_employee_values(instance, fields_by_id, values)
 
-            field_value, created = EmployeeFieldValue.objects.get_or_create(
-                employee=instance, field_id=field_id
-            )
-            field_value.value = value
-            field_value.save()
 
-        instance.save()
-        return instance
\ No newline at end of file
+class DeletionJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DeletionJob
+        fields = ["id", "kind", "form_id", "filters", "status", "total", "deleted", "progress", "error",
+                  "created_at", "updated_at", "finished_at"]
+
+    def get_progress(self, obj):
+        if obj.status == "done":
+            return 1.0
+        return round(min(obj.deleted / obj.total, 1.0), 4) if obj.total else 0.0
+
+
+class TaskSerializer(serializers.ModelSerializer):
+    completion = serializers.SerializerMethodField()
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Task
+        fields = ["id", "name", "status", "attempts", "max_attempts", "progress", "total", "completion", "result",
+                  "error", "run_after", "created_at", "updated_at", "started_at", "finished_at"]
+
+    def get_completion(self, obj):
+        if obj.status == "done":
+            return 1.0
+        return round(min(obj.progress / obj.total, 1.0), 4) if obj.total else 0.0
+
+    def get_error(self, obj):
+        """The exception line of the last failure, without the traceback."""
+        return obj.error.strip().splitlines()[-1] if obj.error.strip() else ""
@@ -0,0 +1,242 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import F
+
+from .models import DynamicField, DynamicForm, Employee, EmployeeFieldValue, typed_values
+
+OPTION_FIELD_TYPES = {"select", "radio", "checkbox"}
+
+
+def bump_data_version(form_id):
+    """Mark the employee data of a form as changed (see DynamicForm.data_version)."""
+    DynamicForm.objects.filter(id=form_id).update(data_version=F("data_version") + 1)
+
+
+def get_fields_by_id(form):
+    """Load every field of the form in one query, keyed by id."""
+    return {field.id: field for field in form.fields.all()}
+
+
+def resolve_field_values(fields_by_id, fields_data, partial=False):
+    """Map submitted ``[{"field_id": ..., "value": ...}]`` items onto the form.
+
+    Field ids are validated as a set against the form. A checkbox group may
+    send one item per ticked box (each possibly the whole selection, as the
+    create page sends it); their options are joined, without repeats, into
+    one ``, ``-separated value. Any other field submitted more than once is
+    rejected.
+
+    Values are then checked with ``validate_field_value``, as imports are:
+    against every field of the form, or with ``partial`` only against the
+    submitted ones.
+    """
+    values = {}
+    invalid = []
+    duplicates = []
+    for item in fields_data:
+        field_id = item.get("field_id")
+        try:
+            field_id = int(field_id)
+        except (TypeError, ValueError):
+            invalid.append(field_id)
+            continue
+        if field_id not in fields_by_id:
+            invalid.append(field_id)
+            continue
+        value = item.get("value")
+        value = None if value is None else str(value)  # as the value table stores it
+        if field_id in values:
+            if fields_by_id[field_id].field_type != "checkbox":
+                duplicates.append(field_id)
+                continue
+            parts = [part.strip() for item in (values[field_id], value) if item for part in item.split(",")]
+            value = ", ".join(dict.fromkeys(part for part in parts if part))
+        values[field_id] = value
+
+    if invalid:
+        ids = ", ".join(str(field_id) for field_id in invalid)
+        raise ValidationError({"field_id": f"Invalid field_id {ids} for this form"})
+    if duplicates:
+        ids = ", ".join(str(field_id) for field_id in dict.fromkeys(duplicates))
+        raise ValidationError({"field_id": f"field_id {ids} submitted more than once"})
+
+    errors = {}
+    for field_id, field in fields_by_id.items():
+        if partial and field_id not in values:
+            continue
+        error = validate_field_value(field, values.get(field_id))
+        if error:
+            errors[field.label] = error
+    if errors:
+        raise ValidationError(errors)
+    return values
+
+
+def validate_field_value(field, value):
+    """Check a raw value against the field's schema, returning an error message or None."""
+    value = "" if value is None else str(value).strip()
+    if not value:
+        return "This field is required." if field.required else None
+
+    typed = typed_values(field.field_type, value)
+    if field.field_type == "number" and typed["value_number"] is None:
+        return "Enter a number."
+    if field.field_type == "date" and typed["value_date"] is None:
+        return "Enter a valid date (YYYY-MM-DD)."
+    if field.field_type == "email":
+        try:
+            validate_email(value)
+        except ValidationError:
+            return "Enter a valid email address."
+    if field.field_type in OPTION_FIELD_TYPES and field.options:
+        choices = [v.strip() for v in value.split(",")] if field.field_type == "checkbox" else [value]
+        invalid = [choice for choice in choices if choice not in field.options]
+        if invalid:
+            return f"Invalid option {', '.join(invalid)}."
+    return None
+
+
+def build_field_values(employee, fields_by_id, values):
+    """Return unsaved EmployeeFieldValue rows with their typed columns filled."""
+    field_values = []
+    for field_id, value in values.items():
+        field_value = EmployeeFieldValue(employee_id=employee.id, field_id=field_id, value=value)
+        field_value.populate_typed_values(fields_by_id[field_id].field_type)
+        field_values.append(field_value)
+    return field_values
+
+
+def snapshot_data(values):
+    """Build the ``Employee.data`` snapshot from ``{field_id: value}``, values as strings like the value table."""
+    return {str(field_id): None if value is None else str(value) for field_id, value in values.items()}
+
+
+def create_employees(form, fields_by_id, rows):
+    """Create one employee per ``{field_id: value}`` dict in ``rows``.
+
+    Employees (with their snapshot) and their values are each written with a
+    single ``bulk_create`` inside one transaction.
+    """
+    with transaction.atomic():
+        employees = Employee.objects.bulk_create([
+            Employee(form=form, data=snapshot_data(values), schema_version=form.schema_version)
+            for values in rows
+        ])
+        field_values = []
+        for employee, values in zip(employees, rows):
+            field_values.extend(build_field_values(employee, fields_by_id, values))
+        EmployeeFieldValue.objects.bulk_create(field_values)
+        bump_data_version(form.id)
+    return employees
+
+
+def create_employee(form, fields_data):
+    """Create an employee and all of its field values in one transaction."""
+    fields_by_id = get_fields_by_id(form)
+    values = resolve_field_values(fields_by_id, fields_data)
+    return create_employees(form, fields_by_id, [values])[0]
+
+
+def update_employees_values(updates):
+    """Upsert values for many employees and refresh their snapshots.
+
+    ``updates`` is a list of ``(employee, fields_by_id, {field_id: value})``
+    with ``employee.form`` loaded. Existing values are read in one query and
+    written back with one ``bulk_update``/``bulk_create`` each.
+    """
+    with transaction.atomic():
+        existing = {}
+        values_qs = EmployeeFieldValue.objects.filter(employee_id__in=[employee.id for employee, _, _ in updates])
+        for field_value in values_qs:
+            existing.setdefault(field_value.employee_id, {})[field_value.field_id] = field_value
+
+        changed, created = [], []
+        for employee, fields_by_id, values in updates:
+            current = existing.get(employee.id, {})
+            for field_id, value in values.items():
+                field_value = current.get(field_id)
+                if field_value is None:
+                    created.extend(build_field_values(employee, fields_by_id, {field_id: value}))
+                elif field_value.value != value:
+                    field_value.value = value
+                    field_value.populate_typed_values(fields_by_id[field_id].field_type)
+                    changed.append(field_value)
+
+            data = {fv.field_id: fv.value for fv in current.values()}
+            data.update(values)
+            employee.data = snapshot_data(data)
+            employee.schema_version = employee.form.schema_version
+
+        EmployeeFieldValue.objects.bulk_update(changed, ["value", "value_text", "value_number", "value_date"])
+        EmployeeFieldValue.objects.bulk_create(created)
+        Employee.objects.bulk_update([employee for employee, _, _ in updates], ["data", "schema_version"])
+        for form_id in {employee.form_id for employee, _, _ in updates}:
+            bump_data_version(form_id)
+    return [employee for employee, _, _ in updates]
+
+
+def update_employee_values(employee, fields_by_id, values):
+    """Upsert ``{field_id: value}`` for an employee and refresh its snapshot."""
+    return update_employees_values([(employee, fields_by_id, values)])[0]
+
+
+def delete_employee(employee):
+    # The post_delete signal bumps the form's data_version.
+    with transaction.atomic():
+        employee.delete()
+
+
+def delete_employees(employees):
+    """Delete an Employee queryset (up to a chunk's worth), values included, in one transaction; returns the count."""
+    with transaction.atomic():
+        # The ids are fixed first, as ``employees`` may filter on the values. The values then go in one
+        # statement; the cascade would load each one to send its post_delete signal.
+        ids = list(employees.values_list("id", flat=True))
+        values = EmployeeFieldValue.objects.filter(employee_id__in=ids)
+        values._raw_delete(values.db)
+        _, deleted = Employee.objects.filter(id__in=ids).delete()
+    return deleted.get(Employee._meta.label, 0)
+
+
+def rebuild_snapshots(employees, chunk_size=2000, on_progress=None):
+    """Rebuild ``Employee.data`` from the value table, ``chunk_size`` employees at a time.
+
+    ``on_progress(rebuilt)`` is called after each chunk.
+    """
+    rebuilt = 0
+    batch = []
+
+    def flush():
+        data = {employee.id: {} for employee in batch}
+        values = EmployeeFieldValue.objects.filter(employee_id__in=list(data)).order_by("id")
+        for employee_id, field_id, value in values.values_list("employee_id", "field_id", "value"):
+            data[employee_id][str(field_id)] = value
+        for employee in batch:
+            employee.data = data[employee.id]
+            employee.schema_version = employee.form.schema_version
+        Employee.objects.bulk_update(batch, ["data", "schema_version"])
+        return len(batch)
+
+    queryset = employees.select_related("form").only("id", "form__schema_version").order_by("id")
+    for employee in queryset.iterator(chunk_size=chunk_size):
+        batch.append(employee)
+        if len(batch) >= chunk_size:
+            rebuilt += flush()
+            batch = []
+            if on_progress is not None:
+                on_progress(rebuilt)
+    if batch:
+        rebuilt += flush()
+    return rebuilt
+
+
+def create_form(form_data, fields_data):
+    """Create a form and all of its fields in one transaction.
+
+    Each item of ``fields_data`` holds the DynamicField kwargs, order included.
+    """
+    with transaction.atomic():
+        form = DynamicForm.objects.create(**form_data)
+        DynamicField.objects.bulk_create([DynamicField(form=form, **field) for field in fields_data])
+    return form
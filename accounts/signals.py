@@ -0,0 +1,121 @@
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import F
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import invalidate_cached_user
+from .avatars import schedule_profile_picture
+from .models import DynamicField, DynamicForm, Employee, EmployeeFieldValue, User
+from .schema_cache import invalidate_form_schema
+from .search import ensure_index
+from .services import bump_data_version, rebuild_snapshots
+
+
+@receiver(post_save, sender=DynamicField)
+@receiver(post_delete, sender=DynamicField)
+def bump_form_schema_version(sender, instance, **kwargs):
+    """Any change to a form's fields invalidates snapshots and cached schemas built from it."""
+    DynamicForm.objects.filter(id=instance.form_id).update(
+        schema_version=F("schema_version") + 1, updated_at=timezone.now()
+    )
+    invalidate_form_schema(instance.form_id)
+
+
+@receiver(pre_save, sender=DynamicForm)
+def keep_stored_versions(sender, instance, update_fields=None, **kwargs):
+    """Saving a stale form instance must not move its version counters backwards.
+
+    Only field changes bump ``schema_version`` (a new name or description
+    leaves employee snapshots valid); the cached schema follows ``updated_at``.
+    """
+    if instance.pk is None or (update_fields is not None and not {"schema_version", "data_version"} & set(update_fields)):
+        return
+    current = DynamicForm.objects.filter(id=instance.pk).values_list("schema_version", "data_version").first()
+    if current is not None:
+        instance.schema_version, instance.data_version = current
+
+
+@receiver(post_save, sender=DynamicForm)
+@receiver(post_delete, sender=DynamicForm)
+def invalidate_form(sender, instance, **kwargs):
+    invalidate_form_schema(instance.id)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def bump_employee_data_version(sender, instance, origin=None, **kwargs):
+    """Employee saves and deletes (admin edits and cascades included) invalidate the list ETags.
+
+    A queryset delete sends one signal per employee; the form is bumped once
+    per ``delete()`` call. The bulk writes in services.py bump it themselves.
+    """
+    if origin is not None:
+        bumped = origin.__dict__.setdefault("_bumped_data_versions", set())
+        if instance.form_id in bumped:
+            return
+        bumped.add(instance.form_id)
+    bump_data_version(instance.form_id)
+
+
+@receiver(post_save, sender=EmployeeFieldValue)
+def refresh_saved_value(sender, instance, **kwargs):
+    """A value saved outside the services (which use bulk writes) still refreshes its employee's snapshot."""
+    rebuild_snapshots(Employee.objects.filter(id=instance.employee_id))
+    DynamicForm.objects.filter(employees__id=instance.employee_id).update(data_version=F("data_version") + 1)
+
+
+@receiver(post_delete, sender=EmployeeFieldValue)
+def refresh_deleted_value(sender, instance, origin=None, **kwargs):
+    """Likewise for values deleted on their own (e.g. in the admin), once per employee per ``delete()`` call.
+
+    Values deleted along with their employee, field or form are left to
+    those models' receivers.
+    """
+    if origin is not None and getattr(origin, "model", type(origin)) is not EmployeeFieldValue:
+        return
+    if origin is not None:
+        refreshed = origin.__dict__.setdefault("_refreshed_employees", set())
+        if instance.employee_id in refreshed:
+            return
+        refreshed.add(instance.employee_id)
+    refresh_saved_value(sender, instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """Password changes, profile updates and deletions must reach CachedJWTAuthentication."""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def remember_profile_picture(sender, instance, update_fields=None, **kwargs):
+    """Look up the stored picture only for users not loaded with it (see ``User.from_db``)."""
+    if instance.pk is None or (update_fields is not None and "profile_picture" not in update_fields):
+        return
+    if not hasattr(instance, "_stored_profile_picture"):
+        stored = User.objects.filter(pk=instance.pk).values_list("profile_picture", flat=True).first()
+        instance._stored_profile_picture = stored or ""
+
+
+@receiver(post_save, sender=User)
+def process_profile_picture(sender, instance, created, update_fields=None, **kwargs):
+    """Render the picture's variants after an upload (or drop them when it's cleared)."""
+    if update_fields is not None and "profile_picture" not in update_fields:
+        return
+    name = instance.profile_picture.name or ""
+    if (created and name) or (not created and name != instance._stored_profile_picture):
+        schedule_profile_picture(instance.pk, name)
+    instance._stored_profile_picture = name
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """Put back search triggers dropped by a migration that remade the value table."""
+    if sender.label != "accounts":
+        return
+    connection = connections[using]
+    if ("accounts", "0007_fieldvalue_search_index") in MigrationRecorder(connection).applied_migrations():
+        ensure_index(connection)
@@ -0,0 +1,84 @@
+"""Sorting a form's employees by one of its fields.
+
+``?sort=<field id>`` (``-<field id>`` for descending) orders employees by
+the field's typed value: numbers and dates by ``value_number`` and
+``value_date``, everything else by the lower-cased ``value_text``. The
+value is annotated as ``sort_value`` through a correlated subquery that
+probes the (employee, field) index, so the database sorts in one pass.
+Employees without a value come last in either direction; ties are broken
+by id.
+"""
+from collections import namedtuple
+
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils.dateparse import parse_date
+
+from .filters import typed_column
+from .models import EmployeeFieldValue
+
+SORT_PARAM = "sort"
+
+
+class SortError(ValueError):
+    """An invalid ``sort`` parameter; the message is safe to show to the client."""
+
+
+class Sort(namedtuple("Sort", ["field", "descending"])):
+    @property
+    def param(self):
+        return f"{'-' if self.descending else ''}{self.field.id}"
+
+    @property
+    def column(self):
+        return typed_column(self.field.field_type)
+
+
+def parse_sort(raw, fields):
+    """The Sort requested by a ``sort`` parameter, or None when it is empty."""
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    fields_by_id = {str(field.id): field for field in fields}
+    field = fields_by_id.get(raw.removeprefix("-"))
+    if field is None:
+        raise SortError(f"Cannot sort by {raw!r}; pass a field id of this form, prefixed with - for descending.")
+    return Sort(field, raw.startswith("-"))
+
+
+def sort_employees(employees, sort):
+    """Annotate ``sort_value`` and order an Employee queryset by it."""
+    values = EmployeeFieldValue.objects.filter(employee_id=OuterRef("pk"), field_id=sort.field.id)
+    employees = employees.annotate(sort_value=Subquery(values.values(sort.column)[:1]))
+    if sort.descending:
+        return employees.order_by(F("sort_value").desc(nulls_last=True), "-id")
+    return employees.order_by(F("sort_value").asc(nulls_last=True), "id")
+
+
+def seek_after(sort, value, pk):
+    """The rows after ``(value, pk)`` in ``sort_employees`` order, for keyset pagination."""
+    op = "lt" if sort.descending else "gt"
+    if value is None:
+        return Q(sort_value__isnull=True, **{f"id__{op}": pk})
+    return Q(**{f"sort_value__{op}": value}) | Q(sort_value=value, **{f"id__{op}": pk}) | Q(sort_value__isnull=True)
+
+
+def dump_sort_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def load_sort_value(sort, value):
+    """Inverse of ``dump_sort_value``; raises ValueError for a value of the wrong type."""
+    if value is None:
+        return None
+    if sort.column == "value_number":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return value
+    if sort.column == "value_date":
+        parsed = parse_date(value) if isinstance(value, str) else None
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return value
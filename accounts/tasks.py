@@ -0,0 +1,35 @@
+"""The tasks run by ``manage.py run_workers`` (see accounts.queue)."""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F
+
+from .avatars import process_profile_picture
+from .deletions import run_job
+from .models import Employee
+from .queue import task
+from .search import rebuild_index
+from .services import rebuild_snapshots
+
+
+@task("deletions.run_job", timeout=120)
+def run_deletion_job(run, job_id):
+    run_job(job_id, on_progress=run.progress)
+
+
+@task("avatars.process_profile_picture", timeout=60)
+def process_avatar(run, user_id, picture_name):
+    process_profile_picture(user_id, picture_name)
+
+
+@task("search.rebuild_index", max_attempts=1, timeout=3600)
+def rebuild_search_index(run, database=DEFAULT_DB_ALIAS):
+    return {"rebuilt": rebuild_index(connections[database])}
+
+
+@task("snapshots.rebuild", timeout=300)
+def rebuild_employee_snapshots(run, form_id=None, stale=False):
+    employees = Employee.objects.all()
+    if form_id is not None:
+        employees = employees.filter(form_id=form_id)
+    if stale:
+        employees = employees.filter(schema_version__lt=F("form__schema_version"))
+    return {"rebuilt": rebuild_snapshots(employees, on_progress=run.progress)}
@@ -1,5 +1,7 @@
 from django import template
 
+from accounts.avatars import avatar_url as variant_url
+
 register = template.Library()
 
 @register.filter
@@ -9,10 +11,9 @@ def get_item(dictionary, key):
     return ""
 
 @register.filter
-def get_field_value(field_values, field_id):
-    value = field_values.filter(field_id=field_id).first()
-    return value.value if value else ""
+def is_equal(val1, val2):
+    return str(val1) == str(val2)
 
 @register.filter
-def is_equal(val1, val2):
-    return str(val1) == str(val2)
\ No newline at end of file
+def avatar_url(user, size):
+    return variant_url(user, int(size))
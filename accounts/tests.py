@@ -1,3 +1,1139 @@
-from django.test import TestCase
+import io
+import gzip
+import json
+import tempfile
+import threading
+import warnings
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.db.models.signals import post_migrate
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import avatars, deletions, metrics, renderers, schema_cache, search
+from .aggregations import field_values, option_counts
+from .authentication import user_cache_key
+from .exporters import export_employees
+from .filters import MAX_FILTER_CONDITIONS, MAX_FILTER_DEPTH, FilterError, filter_employees
+from .importers import import_employees
+from .models import DeletionJob, DynamicField, DynamicForm, Employee, EmployeeFieldValue, Task, User
+from .queue import claim, enqueue, execute, finish, task
+from .routers import PrimaryReplicaRouter, use_replica
+from .serializers import DynamicFormSerializer, EmployeeSnapshotSerializer
+from .services import create_employee, create_form
+
+
+def make_form(*field_types, name="Staff"):
+    """A form with one field per type (options for option fields), returned with its fields in order."""
+    form = create_form({"name": name}, [
+        {
+            "label": f"{field_type.capitalize()} {order}",
+            "field_type": field_type,
+            "required": False,
+            "options": ["Red", "Green", "Blue"] if field_type in ("select", "radio", "checkbox") else None,
+            "order": order,
+        }
+        for order, field_type in enumerate(field_types)
+    ])
+    return form, list(form.fields.order_by("order"))
+
+
+def jwt_headers(user):
+    return {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw-12345-abc")
+        self.headers = jwt_headers(self.user)
+
+    def test_cache_holds_no_password_hash(self):
+        self.assertEqual(self.client.get(reverse("api-profile"), **self.headers).status_code, 200)
+        entry = cache.get(user_cache_key(self.user.id))
+        self.assertNotIn("password", entry["fields"])
+        self.assertNotIn(self.user.password, str(entry))
+
+    def test_cached_user_serves_full_profile(self):
+        self.client.get(reverse("api-profile"), **self.headers)
+        response = self.client.get(reverse("api-profile"), **self.headers)
+        self.assertEqual(response.json()["user"]["email"], "alice@example.com")
+
+    def test_inactive_cached_user_is_rejected(self):
+        self.client.get(reverse("api-profile"), **self.headers)
+        entry = cache.get(user_cache_key(self.user.id))
+        entry["fields"]["is_active"] = False
+        cache.set(user_cache_key(self.user.id), entry)
+        self.assertEqual(self.client.get(reverse("api-profile"), **self.headers).status_code, 401)
+
+    def test_revoked_token_is_rejected_by_sync_and_async_apis(self):
+        form, _ = make_form("text")
+        # The modules hold simplejwt's settings object, which override_settings would replace.
+        with mock.patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True):
+            headers = jwt_headers(self.user)
+            async_get = async_to_sync(self.async_client.get)
+            async_url, async_headers = reverse("form-detail-async", args=[form.id]), {"Authorization": headers["HTTP_AUTHORIZATION"]}
+            for _ in range(2):  # a cache miss, then a hit
+                self.assertEqual(self.client.get(reverse("api-profile"), **headers).status_code, 200)
+                self.assertEqual(async_get(async_url, headers=async_headers).status_code, 200)
+
+            entry = cache.get(user_cache_key(self.user.id))
+            entry["password_changed"] = "changed"
+            cache.set(user_cache_key(self.user.id), entry)
+            self.assertEqual(self.client.get(reverse("api-profile"), **headers).status_code, 401)
+            self.assertEqual(async_get(async_url, headers=async_headers).status_code, 401)
+
+    def test_change_password_with_cached_user(self):
+        self.client.get(reverse("api-profile"), **self.headers)
+        body = {"current_password": "pw-12345-abc", "new_password": "pw-67890-def", "confirm_password": "pw-67890-def"}
+        response = self.client.post(reverse("change-password"), body, content_type="application/json", **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("pw-67890-def"))
+        self.assertEqual(self.user.email, "alice@example.com")
+
+
+class ResolveFieldValuesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("bob", "bob@example.com", "pw-12345-abc")
+        self.form, (self.name, self.colours) = make_form("text", "checkbox")
+
+    def create(self, fields):
+        body = {"form_id": self.form.id, "fields": fields}
+        return self.client.post(reverse("employee-create"), body, content_type="application/json", **jwt_headers(self.user))
+
+    def test_repeated_checkbox_items_are_merged(self):
+        response = self.create([
+            {"field_id": self.colours.id, "value": "Red"},
+            {"field_id": self.colours.id, "value": "Blue"},
+        ])
+        self.assertEqual(response.status_code, 201)
+        employee = Employee.objects.get()
+        self.assertEqual(EmployeeFieldValue.objects.get(employee=employee).value, "Red, Blue")
+        self.assertEqual(employee.data[str(self.colours.id)], "Red, Blue")
+
+    def test_create_page_payload_is_not_duplicated(self):
+        # create_employee.html sends the whole selection once per ticked box.
+        body = {"form_id": self.form.id, "fields": [
+            {"field_id": str(self.colours.id), "value": "Red, Blue"},
+            {"field_id": str(self.colours.id), "value": "Red, Blue"},
+        ]}
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("save_employee"), body, content_type="application/json")
+        self.assertEqual(response.json()["success"], True)
+        field_value = EmployeeFieldValue.objects.get()
+        self.assertEqual((field_value.value, field_value.value_text), ("Red, Blue", "red,blue"))
+        self.assertEqual(Employee.objects.get().data[str(self.colours.id)], "Red, Blue")
+
+    def test_repeated_other_field_is_rejected(self):
+        response = self.create([{"field_id": self.name.id, "value": "A"}, {"field_id": self.name.id, "value": "B"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Employee.objects.exists())
+
+    def test_values_are_stored_as_strings(self):
+        form, (salary,) = make_form("number")
+        body = {"form_id": form.id, "fields": [{"field_id": salary.id, "value": 100}]}
+        response = self.client.post(reverse("employee-create"), body, content_type="application/json",
+                                    **jwt_headers(self.user))
+        self.assertEqual(response.status_code, 201)
+        employee = Employee.objects.get()
+        self.assertEqual(employee.data, {str(salary.id): "100"})
+
+        field_value = EmployeeFieldValue.objects.get(employee=employee)
+        field_value.value = "250"
+        field_value.save()
+        employee.refresh_from_db()
+        self.assertEqual(employee.data, {str(salary.id): "250"})
+
+    def test_deleting_a_value_refreshes_the_snapshot(self):
+        employee = create_employee(self.form, [
+            {"field_id": self.name.id, "value": "Asha"}, {"field_id": self.colours.id, "value": "Red"},
+        ])
+        data_version = DynamicForm.objects.get(id=self.form.id).data_version
+        EmployeeFieldValue.objects.filter(field=self.colours).delete()
+        employee.refresh_from_db()
+        self.assertEqual(employee.data, {str(self.name.id): "Asha"})
+        self.assertEqual(DynamicForm.objects.get(id=self.form.id).data_version, data_version + 1)
+
+        EmployeeFieldValue.objects.get(field=self.name).delete()
+        employee.refresh_from_db()
+        self.assertEqual(employee.data, {})
+
+    def test_out_of_range_number_is_rejected(self):
+        form, (salary,) = make_form("number")
+        body = {"form_id": form.id, "fields": [{"field_id": salary.id, "value": "1e400"}]}
+        response = self.client.post(reverse("employee-create"), body, content_type="application/json",
+                                    **jwt_headers(self.user))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[salary.label], ["Enter a number."])
+
+    def test_values_are_validated_like_imports(self):
+        response = self.create([{"field_id": self.colours.id, "value": "Red,Purple"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(self.colours.label, response.json())
+        self.assertFalse(Employee.objects.exists())
+
+
+class BackgroundWorkOwnershipTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pw-12345-abc")
+        self.other = User.objects.create_user("other", "other@example.com", "pw-12345-abc")
+        self.task = Task.objects.create(name="search.rebuild_index", timeout=60, created_by=self.owner)
+        self.job = DeletionJob.objects.create(kind="form", form_id=1, created_by=self.owner)
+
+    def test_task_is_visible_to_its_creator_only(self):
+        url = reverse("task-detail", args=[self.task.id])
+        self.assertEqual(self.client.get(url, **jwt_headers(self.owner)).status_code, 200)
+        self.assertEqual(self.client.get(url, **jwt_headers(self.other)).status_code, 404)
+
+    def test_deletion_job_is_visible_to_its_creator_only(self):
+        url = reverse("deletion-job-detail", args=[self.job.id])
+        self.assertEqual(self.client.get(url, **jwt_headers(self.owner)).status_code, 200)
+        self.assertEqual(self.client.get(url, **jwt_headers(self.other)).status_code, 404)
+
+
+CALLS = []
+
+
+@task("tests.record", max_attempts=2, timeout=30)
+def record_task(run, fail=False):
+    CALLS.append(run.task.attempts)
+    run.progress(1, 1)
+    if fail:
+        raise RuntimeError("boom")
+    return {"ok": True}
+
+
+@override_settings(TASKS_ALWAYS_EAGER=False, TASK_RETRY_DELAY=10)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_claim_is_exclusive(self):
+        queued = enqueue("tests.record")
+        claimed = claim("w1")
+        self.assertEqual(claimed.id, queued.id)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), ("running", "w1", 1))
+        self.assertIsNone(claim("w2"))
+
+    def test_success_records_result(self):
+        queued = enqueue("tests.record")
+        execute(claim("w1"), "w1")
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.result, queued.progress, queued.locked_by), ("done", {"ok": True}, 1, ""))
+
+    def test_failure_is_retried_with_backoff(self):
+        queued = enqueue("tests.record", fail=True)
+        before = timezone.now()
+        with self.assertLogs("accounts.queue", "ERROR"):
+            execute(claim("w1"), "w1")
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "queued")
+        self.assertIn("boom", queued.error)
+        self.assertGreaterEqual(queued.run_after, before + timedelta(seconds=10))
+        self.assertIsNone(claim("w1"))  # not before the backoff lapses
+
+        Task.objects.filter(id=queued.id).update(run_after=timezone.now())
+        with self.assertLogs("accounts.queue", "ERROR"):
+            execute(claim("w1"), "w1")
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ("failed", 2))
+        self.assertIsNotNone(queued.finished_at)
+        self.assertEqual(CALLS, [1, 2])
+
+    def test_expired_claim_is_reclaimed(self):
+        queued = enqueue("tests.record")
+        stale = claim("w1")
+        Task.objects.filter(id=queued.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = claim("w2")
+        self.assertEqual((reclaimed.id, reclaimed.locked_by, reclaimed.attempts), (queued.id, "w2", 2))
+
+        # The first worker's late outcome must not overwrite the new claim.
+        finish(stale, "w1", status="failed", error="late")
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.locked_by, queued.error), ("running", "w2", ""))
+
+    def test_exhausted_attempts_fail_without_running(self):
+        queued = enqueue("tests.record")
+        Task.objects.filter(id=queued.id).update(attempts=2)
+        execute(claim("w1"), "w1")
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "failed")
+        self.assertEqual(CALLS, [])
+
+    def test_unknown_task_fails(self):
+        queued = Task.objects.create(name="tests.missing", timeout=30)
+        execute(claim("w1"), "w1")
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "failed")
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_eager_mode_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queued = enqueue("tests.record")
+            self.assertEqual(CALLS, [])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.locked_by), ("done", ""))
+        self.assertEqual(CALLS, [1])
+
+    def test_run_deletion_jobs_requeues_only_orphaned_jobs(self):
+        orphaned = DeletionJob.objects.create(kind="form", form_id=1, status="running")
+        covered = DeletionJob.objects.create(kind="form", form_id=2)
+        enqueue("deletions.run_job", job_id=covered.id)
+        call_command("run_deletion_jobs", stdout=io.StringIO())
+        tasks = Task.objects.filter(name="deletions.run_job")
+        self.assertEqual(sorted(t.kwargs["job_id"] for t in tasks), sorted([orphaned.id, covered.id]))
+
+
+class FilterExpressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.form, (cls.name, cls.salary, cls.joined, cls.team) = make_form("text", "number", "date", "select")
+        rows = [
+            ("Asha Nair", "50000", "2020-01-15", "Red"),
+            ("Ravi Kumar", "72000", "2021-06-01", "Green"),
+            ("Meera Menon", "", "2019-03-20", "Red"),
+            ("John Smith", "120000", "", "Blue"),
+        ]
+        cls.ids = {}
+        for name, salary, joined, team in rows:
+            values = zip((cls.name, cls.salary, cls.joined, cls.team), (name, salary, joined, team))
+            cls.ids[name] = create_employee(cls.form, [{"field_id": f.id, "value": v} for f, v in values if v]).id
+
+    def names(self, expression):
+        employees = filter_employees(Employee.objects.filter(form=self.form), [self.name, self.salary, self.joined, self.team], {"filter": json.dumps(expression)})
+        by_id = {pk: name for name, pk in self.ids.items()}
+        return sorted(by_id[pk] for pk in employees.values_list("id", flat=True))
+
+    def test_operators(self):
+        cases = [
+            ({"field": self.team.id, "op": "eq", "value": "Red"}, ["Asha Nair", "Meera Menon"]),
+            ({"field": self.team.id, "op": "ne", "value": "Red"}, ["John Smith", "Ravi Kumar"]),
+            ({"field": self.salary.id, "op": "ne", "value": 50000}, ["John Smith", "Meera Menon", "Ravi Kumar"]),
+            ({"field": self.team.id, "op": "in", "value": ["Green", "Blue"]}, ["John Smith", "Ravi Kumar"]),
+            ({"field": self.name.id, "op": "prefix", "value": "R"}, ["Ravi Kumar"]),
+            ({"field": self.name.id, "op": "contains", "value": "men"}, ["Meera Menon"]),
+            ({"field": self.salary.id, "op": "range", "value": [60000, None]}, ["John Smith", "Ravi Kumar"]),
+            ({"field": self.salary.id, "op": "range", "value": [None, 72000]}, ["Asha Nair", "Ravi Kumar"]),
+            ({"field": self.joined.id, "op": "range", "value": ["2020-01-01", "2020-12-31"]}, ["Asha Nair"]),
+            ({"field": self.salary.id, "op": "empty"}, ["Meera Menon"]),
+            ({"field": self.salary.id, "op": "empty", "value": False}, ["Asha Nair", "John Smith", "Ravi Kumar"]),
+            ({"field": self.salary.id, "op": "match", "value": "72000"}, ["Ravi Kumar"]),
+            ({"field": self.name.id, "op": "match", "value": "SMI"}, ["John Smith"]),
+        ]
+        for expression, expected in cases:
+            with self.subTest(expression=expression):
+                self.assertEqual(self.names(expression), expected)
+
+    def test_connectives(self):
+        red = {"field": self.team.id, "op": "eq", "value": "Red"}
+        rich = {"field": self.salary.id, "op": "range", "value": [60000, None]}
+        self.assertEqual(self.names([red, {"field": self.salary.id, "op": "empty", "value": False}]), ["Asha Nair"])
+        self.assertEqual(self.names({"or": [red, rich]}), ["Asha Nair", "John Smith", "Meera Menon", "Ravi Kumar"])
+        self.assertEqual(self.names({"not": red}), ["John Smith", "Ravi Kumar"])
+        self.assertEqual(self.names({"not": {"or": [red, rich]}}), [])
+
+    def test_invalid_expressions(self):
+        red = {"field": self.team.id, "op": "eq", "value": "Red"}
+        nested = red
+        for _ in range(MAX_FILTER_DEPTH + 1):
+            nested = {"not": nested}
+        invalid = [
+            nested,
+            [red] * (MAX_FILTER_CONDITIONS + 1),
+            {"field": 999999, "op": "eq", "value": "x"},
+            {"field": self.team.id, "op": "like", "value": "x"},
+            {"field": self.salary.id, "op": "eq", "value": "lots"},
+            {"field": self.salary.id, "op": "range", "value": [None, None]},
+            {"field": self.team.id, "op": "in", "value": []},
+            {"and": []},
+            "Red",
+        ]
+        for expression in invalid:
+            with self.subTest(expression=expression), self.assertRaises(FilterError):
+                self.names(expression)
+
+    def test_deeply_nested_json_is_a_400(self):
+        user = User.objects.create_user("carol", "carol@example.com", "pw-12345-abc")
+        cache.clear()
+        url = reverse("employee-list-by-form", args=[self.form.id])
+        for raw in ("[" * 3000, "not json"):
+            with self.subTest(raw=raw[:10]):
+                response = self.client.get(url, {"filter": raw}, **jwt_headers(user))
+                self.assertEqual(response.status_code, 400)
+
+
+class SortedKeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.form, (cls.salary, cls.joined) = make_form("number", "date")
+        cls.user = User.objects.create_user("dave", "dave@example.com", "pw-12345-abc")
+        cls.salaries = {}
+        for salary in ["300", None, "100", "300", None, "20", "100", None]:
+            fields = [{"field_id": cls.salary.id, "value": salary}] if salary else []
+            employee = create_employee(cls.form, fields)
+            cls.salaries[employee.id] = float(salary) if salary else None
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, sort):
+        url = reverse("employee-list-by-form", args=[self.form.id])
+        params = {"sort": sort, "page_size": 2}
+        ids = []
+        while url:
+            data = self.client.get(url, params, **jwt_headers(self.user)).json()
+            ids.extend(row["id"] for row in data["results"])
+            url, params = data["next"], {}
+        return ids
+
+    def expected(self, descending):
+        with_value = [pk for pk, salary in self.salaries.items() if salary is not None]
+        without = sorted((pk for pk, salary in self.salaries.items() if salary is None), reverse=descending)
+        with_value.sort(key=lambda pk: (self.salaries[pk], pk), reverse=descending)
+        return with_value + without
+
+    def test_ascending_pages_put_nulls_last(self):
+        self.assertEqual(self.walk(str(self.salary.id)), self.expected(descending=False))
+
+    def test_descending_pages_put_nulls_last(self):
+        self.assertEqual(self.walk(f"-{self.salary.id}"), self.expected(descending=True))
+
+    def test_cursor_of_another_sort_is_rejected(self):
+        url = reverse("employee-list-by-form", args=[self.form.id])
+        first = self.client.get(url, {"sort": self.salary.id, "page_size": 2}, **jwt_headers(self.user)).json()
+        cursor = first["next"].split("cursor=")[1].split("&")[0]
+        response = self.client.get(url, {"sort": f"-{self.salary.id}", "cursor": cursor}, **jwt_headers(self.user))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_sort_field_is_a_400(self):
+        url = reverse("employee-list-by-form", args=[self.form.id])
+        self.assertEqual(self.client.get(url, {"sort": "nope"}, **jwt_headers(self.user)).status_code, 400)
+
+
+class LeanRowsTests(TestCase):
+    """The lean list path must produce exactly the serializers' bytes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.form, cls.fields = make_form("text", "number", "checkbox", "date")
+        make_form("select", name="Other")
+        cls.user = User.objects.create_user("erin", "erin@example.com", "pw-12345-abc")
+        values = ["Zoë \u2028 \"quoted\" <b>", "42", "Red,Blue", "2024-02-29"]
+        for count in range(3):
+            fields = [{"field_id": f.id, "value": v} for f, v in zip(cls.fields, values) if count or f.field_type != "date"]
+            create_employee(cls.form, fields)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, **params):
+        return self.client.get(url, params, **jwt_headers(self.user))
+
+    def test_employee_list_matches_serializer(self):
+        response = self.get(reverse("employee-list-by-form", args=[self.form.id]))
+        data = response.json()
+        employees = Employee.objects.filter(form=self.form).order_by("created_at", "id")
+        serialized = EmployeeSnapshotSerializer(employees, many=True, context={"form_fields": self.fields}).data
+        expected = JSONRenderer().render({"next": data["next"], "first": data["first"], "results": serialized})
+        self.assertEqual(response.content, expected)
+
+    def test_form_list_matches_serializer(self):
+        response = self.get(reverse("form-list"))
+        data = response.json()
+        forms = DynamicForm.objects.prefetch_related("fields").order_by("-created_at", "-id")
+        expected = JSONRenderer().render({"next": data["next"], "first": data["first"], "results": DynamicFormSerializer(forms, many=True).data})
+        self.assertEqual(response.content, expected)
+
+    def test_renderer_without_orjson_renders_the_same(self):
+        data = {"when": timezone.now(), "text": "a\u2028b\u2029c é", 1: [1.5, None, True]}
+        rendered = renderers.OrjsonRenderer().render(data)
+        orjson, renderers.orjson = renderers.orjson, None
+        try:
+            self.assertEqual(renderers.OrjsonRenderer().render(data), rendered)
+        finally:
+            renderers.orjson = orjson
+        self.assertEqual(rendered, JSONRenderer().render(data))
+
+    def test_compact_format_carries_the_same_values(self):
+        url = reverse("employee-list-by-form", args=[self.form.id])
+        full = self.get(url).json()["results"]
+        compact = self.get(url, format="compact")
+        self.assertEqual(compact["Content-Type"], renderers.CompactRenderer.media_type)
+        data = compact.json()
+        ids = [field["field_id"] for field in data["fields"]]
+        for row, employee in zip(data["results"], full):
+            self.assertEqual(row[:2], [employee["id"], employee["created_at"]])
+            values = {field_id: value for field_id, value in zip(ids, row[2:]) if value is not None}
+            self.assertEqual(values, {field["field_id"]: field["value"] for field in employee["fields"]})
+
+
+class FormSchemaCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.form, (self.name,) = make_form("text")
+
+    def test_warm_read_skips_the_database(self):
+        schema_cache.get_form_schema(self.form.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(schema_cache.get_form_schema(self.form.id)["name"], "Staff")
+
+    def test_field_change_is_seen_after_commit(self):
+        schema_cache.get_form_schema(self.form.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            DynamicField.objects.create(form=self.form, label="Email", field_type="email", order=1)
+        schema = schema_cache.get_form_schema(self.form.id)
+        self.assertEqual([field["label"] for field in schema["fields"]], ["Text 0", "Email"])
+        self.assertEqual(schema["schema_version"], 2)
+
+    def test_rename_keeps_schema_version_and_snapshots(self):
+        employee = create_employee(self.form, [{"field_id": self.name.id, "value": "Asha"}])
+        schema_cache.get_form_schema(self.form.id)
+        form = DynamicForm.objects.get(id=self.form.id)
+        form.name = "Team"
+        with self.captureOnCommitCallbacks(execute=True):
+            form.save()
+        schema = schema_cache.get_form_schema(self.form.id)
+        self.assertEqual((schema["name"], schema["schema_version"]), ("Team", 1))
+        employee.refresh_from_db()
+        self.assertEqual(employee.schema_version, DynamicForm.objects.get(id=self.form.id).schema_version)
+
+    def test_reader_cannot_republish_an_older_version(self):
+        serialize = schema_cache.serialize_form_schema
+
+        def serialize_then_write(form):
+            schema = serialize(form)  # the reader has loaded version 1 ...
+            with self.captureOnCommitCallbacks(execute=True):  # ... when a writer commits version 2
+                DynamicField.objects.create(form=self.form, label="Email", field_type="email", order=1)
+            return schema
+
+        with mock.patch.object(schema_cache, "serialize_form_schema", serialize_then_write):
+            self.assertEqual(schema_cache.get_form_schema(self.form.id)["schema_version"], 1)
+        self.assertEqual(schema_cache.get_form_schema(self.form.id)["schema_version"], 2)
+
+    def test_stale_instance_does_not_roll_back_versions(self):
+        stale = DynamicForm.objects.get(id=self.form.id)
+        create_employee(self.form, [{"field_id": self.name.id, "value": "Asha"}])
+        DynamicField.objects.create(form=self.form, label="Email", field_type="email", order=1)
+        stale.description = "Edited"
+        stale.save()
+        self.assertEqual(
+            DynamicForm.objects.filter(id=self.form.id).values_list("schema_version", "data_version").get(), (2, 1)
+        )
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("frank", "frank@example.com", "pw-12345-abc")
+        self.form, (self.name,) = make_form("text")
+        self.employee = create_employee(self.form, [{"field_id": self.name.id, "value": "Asha"}])
+        self.url = reverse("employee-list-by-form", args=[self.form.id])
+
+    def get(self, url, **headers):
+        return self.client.get(url, **jwt_headers(self.user), **headers)
+
+    def test_not_modified_repeats_validators(self):
+        etag = self.get(self.url)["ETag"]
+        response = self.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response["ETag"]), (304, etag))
+
+        url = reverse("form-detail", args=[self.form.id])
+        first = self.get(url)
+        response = self.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual((response["ETag"], response["Last-Modified"]), (first["ETag"], first["Last-Modified"]))
+
+    def test_async_not_modified_repeats_etag(self):
+        get = async_to_sync(self.async_client.get)
+        headers = {"Authorization": jwt_headers(self.user)["HTTP_AUTHORIZATION"]}
+        url = reverse("employee-list-by-form-async", args=[self.form.id])
+        etag = get(url, headers=headers)["ETag"]
+        response = get(url, headers={**headers, "If-None-Match": etag})
+        self.assertEqual((response.status_code, response["ETag"]), (304, etag))
+
+    def assert_etag_changes(self, change):
+        etag = self.get(self.url)["ETag"]
+        change()
+        self.assertNotEqual(self.get(self.url)["ETag"], etag)
+
+    def test_direct_employee_saves_change_the_etag(self):
+        self.assert_etag_changes(lambda: Employee.objects.get(id=self.employee.id).save())
+
+    def test_direct_value_saves_change_the_etag(self):
+        self.assert_etag_changes(lambda: EmployeeFieldValue.objects.get(employee=self.employee).save())
+
+    def test_queryset_deletes_change_the_etag_once(self):
+        create_employee(self.form, [{"field_id": self.name.id, "value": "Ravi"}])
+        before = DynamicForm.objects.get(id=self.form.id).data_version
+        self.assert_etag_changes(lambda: Employee.objects.filter(form=self.form).delete())
+        self.assertEqual(DynamicForm.objects.get(id=self.form.id).data_version, before + 1)
+
+    def test_field_change_changes_the_etag(self):
+        self.assert_etag_changes(lambda: DynamicField.objects.create(form=self.form, label="Email", field_type="email"))
+
+
+class AsyncLoginTests(TransactionTestCase):
+    """The async logins authenticate on the hash pool's threads, so their rows must be committed."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("grace", "grace@example.com", "pw-12345-abc")
+
+    def login(self, password, username="grace"):
+        body = {"username": username, "password": password}
+        return async_to_sync(self.async_client.post)(reverse("api-login-async"), body, content_type="application/json")
+
+    def test_valid_login_returns_tokens(self):
+        response = self.login("pw-12345-abc")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.json())
+
+    def test_failures_send_user_login_failed(self):
+        failures = []
+        handler = lambda sender, credentials, **kwargs: failures.append(credentials["username"])
+        user_login_failed.connect(handler)
+        try:
+            self.assertEqual(self.login("wrong").status_code, 401)
+            self.assertEqual(self.login("pw-12345-abc", username="nobody").status_code, 401)
+        finally:
+            user_login_failed.disconnect(handler)
+        self.assertEqual(failures, ["grace", "nobody"])
+
+    def test_pool_threads_check_their_connections(self):
+        threads = []
+        with mock.patch("accounts.passwords.close_old_connections",
+                        side_effect=lambda: threads.append(threading.current_thread().name)):
+            self.assertEqual(self.login("pw-12345-abc").status_code, 200)
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith("password-hash") for name in threads))
+
+    def test_inactive_user_is_rejected(self):
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertEqual(self.login("pw-12345-abc").status_code, 401)
+
+    def test_outdated_hash_is_upgraded(self):
+        User.objects.filter(id=self.user.id).update(password=make_password("pw-12345-abc", hasher="pbkdf2_sha1"))
+        self.assertEqual(self.login("pw-12345-abc").status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+
+
+class EmployeeListPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.form, (cls.name,) = make_form("text")
+        for name in ["Asha", "Ravi", "Meera"]:
+            create_employee(cls.form, [{"field_id": cls.name.id, "value": name}])
+
+    def async_data(self, **params):
+        return async_to_sync(self.async_client.get)(reverse("employee_list_data_async"), params)
+
+    def test_malformed_form_id(self):
+        self.assertEqual(self.client.get(reverse("employee_list"), {"form": "abc"}).status_code, 200)
+        response = self.async_data(form="abc")
+        self.assertEqual((response.status_code, response.json()["success"]), (404, False))
+
+    def test_search_probe_is_warmed_for_the_read_alias(self):
+        with mock.patch("accounts.async_views.index_available") as probe, \
+                mock.patch("accounts.async_views.router.db_for_read", return_value="default") as db_for_read:
+            self.assertEqual(self.async_data(form=self.form.id).status_code, 200)
+        db_for_read.assert_any_call(EmployeeFieldValue)
+        probe.assert_called_once_with("default")
+
+    def test_async_rows_match_the_page(self):
+        params = {"form": self.form.id, "sort": self.name.id, "page_size": 2, "page": 2}
+        page = self.client.get(reverse("employee_list"), params).context["rows"]
+        data = self.async_data(**params).json()
+        self.assertEqual(data["rows"], page)
+        self.assertEqual((data["page"], data["num_pages"], data["count"]), (2, 2, 3))
+        self.assertEqual(data["rows"][0]["values"], ["Ravi"])
+
+
+class EmployeeBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("batcher", "batcher@example.com", "pw-12345-abc")
+        self.form, (self.name,) = make_form("text")
+        self.employee = create_employee(self.form, [{"field_id": self.name.id, "value": "Asha"}])
+
+    def batch(self, body):
+        return self.client.post(reverse("employee-batch"), body, content_type="application/json", **jwt_headers(self.user))
+
+    def test_array_body_is_rejected(self):
+        response = self.batch([{"op": "delete", "id": self.employee.id}])
+        self.assertEqual((response.status_code, response.json()["success"]), (400, False))
+
+    def test_string_ids_are_accepted(self):
+        response = self.batch({"operations": [
+            {"op": "create", "form_id": str(self.form.id), "fields": [{"field_id": self.name.id, "value": "Ravi"}]},
+            {"op": "update", "id": str(self.employee.id), "fields": [{"field_id": self.name.id, "value": "Meera"}]},
+        ]})
+        self.assertEqual(response.status_code, 200, response.json())
+        self.assertEqual((response.json()["created"], response.json()["updated"]), (1, 1))
+        response = self.batch({"operations": [{"op": "delete", "id": str(self.employee.id)}]})
+        self.assertEqual(response.json()["deleted"], 1)
+        self.assertFalse(Employee.objects.filter(id=self.employee.id).exists())
+
+
+class ImportFileErrorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("importer", "importer@example.com", "pw-12345-abc")
+        self.form, (self.name,) = make_form("text")
+
+    def upload(self, content, name="staff.csv"):
+        body = {"file": SimpleUploadedFile(name, content)}
+        return self.client.post(reverse("employee-import", args=[self.form.id]), body, **jwt_headers(self.user))
+
+    def test_undecodable_and_malformed_files_are_rejected(self):
+        header = self.name.label.encode()
+        for content in [header + b"\nJos\xe9\n", header + b'\n"' + b"x" * 200000 + b'"\n']:
+            response = self.upload(content)
+            self.assertEqual((response.status_code, response.json()["success"]), (400, False))
+        self.assertFalse(Employee.objects.exists())
+
+    def test_command_reports_undecodable_file(self):
+        with tempfile.NamedTemporaryFile(suffix=".csv") as f:
+            f.write(self.name.label.encode() + b"\n\xff\n")
+            f.flush()
+            with self.assertRaisesMessage(CommandError, "not UTF-8"):
+                call_command("import_employees", self.form.id, f.name, stdout=io.StringIO())
+
+
+class SearchIndexTests(TestCase):
+    def test_post_migrate_restores_dropped_triggers(self):
+        if not search.index_available():
+            self.skipTest("SQLite FTS5 is not available.")
+        form, (name,) = make_form("text")
+        with connection.cursor() as cursor:
+            for trigger in search.INDEX_OBJECTS[1:]:
+                cursor.execute(f"DROP TRIGGER {trigger}")
+        create_employee(form, [{"field_id": name.id, "value": "Asha"}])
+
+        post_migrate.send(sender=apps.get_app_config("accounts"), app_config=apps.get_app_config("accounts"),
+                          verbosity=0, interactive=False, using="default")
+        create_employee(form, [{"field_id": name.id, "value": "Ashok"}])
+        values = search.filter_contains(EmployeeFieldValue.objects.all(), "ash")
+        self.assertEqual(sorted(values.values_list("value", flat=True)), ["Asha", "Ashok"])
+        self.assertFalse(search.ensure_index(connection))
+
+
+class CheckboxAggregationTests(TestCase):
+    def setUp(self):
+        self.form, (self.colours,) = make_form("checkbox")
+        for value in ["Red, Blue", "Blue", "Green ,Red", ""]:
+            create_employee(self.form, [{"field_id": self.colours.id, "value": value}])
+        legacy = EmployeeFieldValue.objects.get(value="")
+        legacy.value = "Reddish"  # stored before options were validated
+        legacy.save()
+
+    def test_options_are_counted_without_regex(self):
+        self.assertEqual(EmployeeFieldValue.objects.get(value="Green ,Red").value_text, "green,red")
+        with self.assertNumQueries(1):
+            groups = option_counts(field_values(Employee.objects.all(), self.colours), self.colours)
+        self.assertEqual({group["value"]: group["count"] for group in groups}, {"Red": 2, "Blue": 2, "Green": 1})
+
+    def test_list_computes_facets_on_request(self):
+        url = reverse("employee_list")
+        self.assertEqual(self.client.get(url, {"form": self.form.id}).context["facets"], {})
+        facets = self.client.get(url, {"form": self.form.id, "facets": "1"}).context["facets"]
+        self.assertEqual(facets[self.colours.id][0], {"value": "Red", "count": 2})
+
+
+class ExportEmployeesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("exporter", "exporter@example.com", "pw-12345-abc")
+        self.client.force_login(self.user)
+        self.form, (self.name, self.salary) = make_form("text", "number")
+        for name, salary in [("Asha", "50000"), ("Ravi", "72000"), ("Meera", "")]:
+            create_employee(self.form, [{"field_id": self.name.id, "value": name}, {"field_id": self.salary.id, "value": salary}])
+
+    def export(self, **params):
+        return self.client.get(reverse("export_employees", args=[self.form.id]), params)
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_csv(self):
+        response = self.export()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(response["Content-Disposition"], f'attachment; filename="form-{self.form.id}-employees.csv"')
+        lines = self.body(response).decode().splitlines()
+        self.assertEqual(lines[0], f"id,created_at,{self.name.label},{self.salary.label}")
+        self.assertEqual([line.split(",")[2:] for line in lines[1:]], [["Asha", "50000"], ["Ravi", "72000"], ["Meera", ""]])
+
+    def test_jsonl(self):
+        response = self.export(format="jsonl")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in self.body(response).decode().splitlines()]
+        self.assertEqual([(r[self.name.label], r[self.salary.label]) for r in records],
+                         [("Asha", "50000"), ("Ravi", "72000"), ("Meera", "")])
+
+    def test_gzip(self):
+        response = self.export(format="jsonl", gzip="1")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertTrue(response["Content-Disposition"].endswith('.jsonl.gz"'))
+        self.assertEqual(gzip.decompress(self.body(response)), self.body(self.export(format="jsonl")))
+
+    def test_filters_narrow_the_export(self):
+        lines = self.body(self.export(**{f"field_{self.name.id}": "ravi"})).decode().splitlines()
+        self.assertEqual([line.split(",")[2] for line in lines[1:]], ["Ravi"])
+        expression = json.dumps({"field": self.salary.id, "op": "range", "value": [None, 60000]})
+        lines = self.body(self.export(filter=expression)).decode().splitlines()
+        self.assertEqual([line.split(",")[2] for line in lines[1:]], ["Asha"])
+        self.assertEqual(self.export(filter="{").status_code, 400)
+
+    def test_unsupported_format(self):
+        response = self.export(format="xlsx")
+        self.assertEqual((response.status_code, response.json()["success"]), (400, False))
+
+
+class CsvFormulaTests(TestCase):
+    def test_formula_cells_are_escaped_and_round_trip(self):
+        form, (name, salary) = make_form("text", "number")
+        create_employee(form, [{"field_id": name.id, "value": "=HYPERLINK(\"http://x\")"}, {"field_id": salary.id, "value": "-5"}])
+        create_employee(form, [{"field_id": name.id, "value": "Asha"}, {"field_id": salary.id, "value": "5"}])
+        exported = "".join(export_employees(Employee.objects.filter(form=form), [name, salary]))
+        self.assertIn("\"'=HYPERLINK(\"\"http://x\"\")\",'-5", exported)
+        self.assertIn(",Asha,5", exported)
+
+        Employee.objects.all().delete()
+        report = import_employees(form, io.StringIO(exported))
+        self.assertEqual((report["created"], report["failed"]), (2, 0))
+        values = EmployeeFieldValue.objects.filter(field=name).values_list("value", flat=True)
+        self.assertEqual(sorted(values), ["=HYPERLINK(\"http://x\")", "Asha"])
+        self.assertEqual(sorted(EmployeeFieldValue.objects.filter(field=salary).values_list("value", flat=True)), ["-5", "5"])
+
+
+class ProfilePictureSaveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user("pic", "pic@example.com", "pw-12345-abc", profile_picture="profiles/a.jpg")
+
+    def test_saves_do_not_reread_the_user(self):
+        user = User.objects.get(username="pic")
+        with mock.patch("accounts.signals.schedule_profile_picture") as schedule:
+            with self.assertNumQueries(1):
+                user.last_login = timezone.now()
+                user.save(update_fields=["last_login"])
+            with self.assertNumQueries(1):
+                user.save()
+            schedule.assert_not_called()
+
+            user.profile_picture = "profiles/b.jpg"
+            with self.assertNumQueries(1):
+                user.save()
+            schedule.assert_called_once_with(user.pk, "profiles/b.jpg")
+            user.save()
+            self.assertEqual(schedule.call_count, 1)
+
+    def test_user_built_without_the_picture_is_looked_up(self):
+        user = User.objects.only("id", "username").get(username="pic")
+        with mock.patch("accounts.signals.schedule_profile_picture") as schedule:
+            user.profile_picture = "profiles/c.jpg"
+            user.save(update_fields=["profile_picture"])
+        schedule.assert_called_once_with(user.pk, "profiles/c.jpg")
+
+
+class EmployeeFilterDeleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("deleter", "deleter@example.com", "pw-12345-abc")
+        self.form, (self.name,) = make_form("text")
+        for name in ["Asha", "Ravi", "Meera"]:
+            create_employee(self.form, [{"field_id": self.name.id, "value": name}])
+
+    def delete(self, **params):
+        url = reverse("employee-filter-delete", args=[self.form.id])
+        return self.client.delete(f"{url}?{urlencode(params)}", **jwt_headers(self.user))
+
+    def test_unknown_field_filters_are_rejected(self):
+        other_form, (other_field,) = make_form("text", name="Other")
+        for key in ["field_9999", "field_abc", f"field_{other_field.id}"]:
+            response = self.delete(**{key: "Asha"})
+            self.assertEqual((response.status_code, response.json()["success"]), (400, False), key)
+        self.assertEqual(Employee.objects.filter(form=self.form).count(), 3)
+
+    def test_filtered_delete(self):
+        response = self.delete(**{f"field_{self.name.id}": "asha"})
+        self.assertEqual(response.json(), {"success": True, "deleted": 1})
+        self.assertEqual(Employee.objects.filter(form=self.form).count(), 2)
+
+    def test_delete_all_needs_confirmation(self):
+        self.assertEqual(self.delete().status_code, 400)
+        self.assertEqual(self.delete(all="true").json(), {"success": True, "deleted": 3})
+
+
+@override_settings(DELETE_CHUNK_SIZE=2, DELETE_CHUNK_PAUSE=0, TASKS_ALWAYS_EAGER=False)
+class DeletionJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("deleter", "deleter@example.com", "pw-12345-abc")
+        self.form, (self.name,) = make_form("text")
+        for name in ["Asha", "Ravi", "Meera"]:
+            create_employee(self.form, [{"field_id": self.name.id, "value": name}])
+
+    def start(self, **params):
+        url = reverse("employee-filter-delete", args=[self.form.id])
+        response = self.client.delete(f"{url}?{urlencode(params)}", **jwt_headers(self.user))
+        self.assertEqual(response.status_code, 202)
+        return DeletionJob.objects.get(id=response.json()["job"]["id"]), response
+
+    def test_up_to_one_chunk_is_deleted_inline(self):
+        url = reverse("employee-filter-delete", args=[self.form.id])
+        response = self.client.delete(f"{url}?field_{self.name.id}=r", **jwt_headers(self.user))
+        self.assertEqual(response.json(), {"success": True, "deleted": 2})
+        self.assertFalse(DeletionJob.objects.exists())
+
+    def test_larger_delete_runs_in_chunks(self):
+        job, response = self.start(**{f"field_{self.name.id}": "a"})
+        self.assertEqual((job.kind, job.total, job.status), ("employees", 3, "pending"))
+        self.assertTrue(Task.objects.filter(name="deletions.run_job", kwargs__job_id=job.id, status="queued").exists())
+        self.assertEqual(Employee.objects.count(), 3)
+        self.assertTrue(response.json()["status_url"].endswith(reverse("deletion-job-detail", args=[job.id])))
+
+        late = create_employee(self.form, [{"field_id": self.name.id, "value": "Anand"}])
+        progress = []
+        deletions.run_job(job.id, on_progress=lambda deleted, total: progress.append((deleted, total)))
+        self.assertEqual(progress, [(2, 3), (3, 3)])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), ("done", 3))
+        # Employees added after the request are beyond max_employee_id and kept.
+        self.assertEqual(list(Employee.objects.values_list("id", flat=True)), [late.id])
+
+        detail = self.client.get(reverse("deletion-job-detail", args=[job.id]), **jwt_headers(self.user)).json()
+        self.assertEqual((detail["status"], detail["progress"]), ("done", 1.0))
+
+    def test_failed_job_resumes(self):
+        job, _ = self.start(all="true")
+        real_delete = deletions.delete_employees
+        calls = []
+
+        def flaky_delete(employees):
+            calls.append(1)
+            if len(calls) == 2:
+                raise DatabaseError("database is locked")
+            return real_delete(employees)
+
+        with mock.patch("accounts.deletions.delete_employees", side_effect=flaky_delete):
+            with self.assertRaises(DatabaseError):
+                deletions.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted, job.error), ("failed", 2, "database is locked"))
+        self.assertEqual(Employee.objects.count(), 1)
+
+        deletions.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), ("done", 3))
+        self.assertFalse(Employee.objects.exists())
+
+    def test_form_delete(self):
+        small, _ = make_form("text", name="Small")
+        response = self.client.delete(reverse("form-delete", args=[small.id]), **jwt_headers(self.user))
+        self.assertEqual(response.json(), {"success": True, "deleted": 0})
+        self.assertFalse(DynamicForm.objects.filter(id=small.id).exists())
+
+        response = self.client.delete(reverse("form-delete", args=[self.form.id]), **jwt_headers(self.user))
+        self.assertEqual(response.status_code, 202)
+        job = DeletionJob.objects.get(id=response.json()["job"]["id"])
+        late = create_employee(self.form, [{"field_id": self.name.id, "value": "Anand"}])
+        deletions.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.kind, job.status, job.deleted), ("form", "done", 4))
+        self.assertFalse(DynamicForm.objects.filter(id=self.form.id).exists())
+        self.assertFalse(Employee.objects.filter(id=late.id).exists())
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        with metrics._lock:
+            for metric in metrics.METRICS:
+                metric.series.clear()
+
+    def test_named_route_counters_and_queries(self):
+        make_form("text")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("form_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics.REQUESTS.series, {("form_list", "GET", "200"): 1})
+        self.assertEqual(metrics.LATENCY.series[("form_list", "GET")][-1], 1)
+        self.assertEqual(metrics.DB_QUERIES.series[("form_list",)][-2:], [len(queries), 1])
+        self.assertGreater(metrics.DB_TIME.series[("form_list",)][-2], 0)
+        self.assertEqual(metrics.RESPONSE_SIZE.series[("form_list",)][-2:], [len(response.content), 1])
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("t", "Test.", ("view",), (0.01, 0.1))
+        for value in (0.005, 0.01, 0.05, 3):
+            histogram.observe(("v",), value)
+        self.assertEqual(list(histogram.samples()), [
+            't_bucket{view="v",le="0.01"} 2',
+            't_bucket{view="v",le="0.1"} 3',
+            't_bucket{view="v",le="+Inf"} 4',
+            't_sum{view="v"} 3.065',
+            't_count{view="v"} 4',
+        ])
+
+    def test_unresolved_route(self):
+        self.assertEqual(self.client.get("/accounts/no-such-page/").status_code, 404)
+        self.assertEqual(metrics.REQUESTS.series, {(metrics.UNRESOLVED_VIEW, "GET", "404"): 1})
+
+    def test_async_view(self):
+        response = async_to_sync(self.async_client.get)(reverse("form_list_async"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics.REQUESTS.series, {("form_list_async", "GET", "200"): 1})
+        self.assertGreaterEqual(metrics.DB_QUERIES.series[("form_list_async",)][-2], 1)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_scrape_requires_the_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        self.client.get(reverse("form_list"))
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        self.assertIn('django_http_requests_total{view="form_list",method="GET",status="200"} 1', response.content.decode())
+
+
+class RecordingRouter(PrimaryReplicaRouter):
+    """Records where reads would go, but runs them all on ``default`` (the test replica has no tables)."""
+
+    reads = []
+
+    def db_for_read(self, model, **hints):
+        RecordingRouter.reads.append((model._meta.label, super().db_for_read(model, **hints)))
+        return "default"
+
+
+@override_settings(
+    DATABASES={**settings.DATABASES, "replica": {**settings.DATABASES["default"], "NAME": "replica.sqlite3"}},
+    DATABASE_ROUTERS=["accounts.tests.RecordingRouter"],
+)
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", "Overriding setting DATABASES")
+            super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("reader", "reader@example.com", "pw-12345-abc")
+        self.form, (self.name,) = make_form("text")
+        create_employee(self.form, [{"field_id": self.name.id, "value": "Asha"}])
+        RecordingRouter.reads.clear()
+
+    def reads(self, label):
+        return {alias for model, alias in RecordingRouter.reads if model == label}
+
+    def test_router(self):
+        router = PrimaryReplicaRouter()
+        with use_replica():
+            for model in (DynamicForm, DynamicField, Employee, EmployeeFieldValue):
+                self.assertEqual(router.db_for_read(model), "replica")
+            self.assertEqual(router.db_for_read(User), "default")
+            self.assertEqual(router.db_for_write(Employee), "default")
+        self.assertEqual(router.db_for_read(Employee), "default")
+
+    def test_replica_reads_view(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("employee_list"), {"form": self.form.id})
+        self.assertEqual(self.reads("accounts.DynamicForm"), {"replica"})
+        self.assertEqual(self.reads("accounts.Employee"), {"replica"})
+
+        RecordingRouter.reads.clear()
+        self.client.post(reverse("employee_list") + f"?form={self.form.id}")
+        self.assertEqual(self.reads("accounts.DynamicForm"), {"default"})
+
+    def test_replica_reads_mixin(self):
+        self.assertEqual(self.client.get(reverse("form-list"), **jwt_headers(self.user)).status_code, 200)
+        self.assertEqual(self.reads("accounts.DynamicForm"), {"replica"})
+        self.assertEqual(self.reads("accounts.User"), {"default"})
+
+    def test_form_schema_reads_the_primary(self):
+        with use_replica():
+            self.assertEqual(schema_cache.get_form_schema(self.form.id)["id"], self.form.id)
+        self.assertEqual(self.reads("accounts.DynamicForm"), {"default"})
+
+
+def jpeg_upload(name, size=(300, 200), color="red"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(PROFILE_PICTURE_SIZES=(64, 32), TASKS_ALWAYS_EAGER=False)
+class ProfilePictureVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=self.media))
+        self.user = User.objects.create_user("pic", "pic@example.com", "pw-12345-abc", profile_picture=jpeg_upload("a.jpg"))
+
+    def process(self):
+        avatars.process_profile_picture(self.user.id, self.user.profile_picture.name or "")
+        self.user.refresh_from_db()
+        return self.user.profile_picture_variants
+
+    def test_generate_variants(self):
+        variants = self.process()
+        self.assertEqual(sorted(variants["sizes"]), ["32", "64"])
+        for size, formats in variants["sizes"].items():
+            for file_format, name in formats.items():
+                self.assertIn(variants["digest"], name)
+                with default_storage.open(name) as f, Image.open(f) as image:
+                    self.assertEqual((image.format, image.size), (file_format.upper(), (int(size), int(size))))
+        self.assertEqual(avatars.avatar_url(self.user, 40),
+                         reverse("profile_picture_variant", args=[self.user.id, 64, variants["digest"]]))
+
+    def test_variant_view(self):
+        digest = self.process()["digest"]
+        url = reverse("profile_picture_variant", args=[self.user.id, 64, digest])
+        webp = self.client.get(url, HTTP_ACCEPT="image/avif,image/webp,*/*")
+        self.assertEqual(webp["Content-Type"], "image/webp")
+        self.assertEqual(webp["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertIn("Accept", webp["Vary"])
+        jpeg = self.client.get(url, HTTP_ACCEPT="image/*")
+        self.assertEqual(jpeg["Content-Type"], "image/jpeg")
+        self.assertEqual(b"".join(jpeg.streaming_content)[:2], b"\xff\xd8")
+
+        stale = reverse("profile_picture_variant", args=[self.user.id, 64, "0" * 16])
+        self.assertEqual(self.client.get(stale).status_code, 404)
+        other_size = reverse("profile_picture_variant", args=[self.user.id, 100, digest])
+        self.assertEqual(self.client.get(other_size).status_code, 404)
+
+    def test_old_variants_are_removed(self):
+        old = self.process()
+        self.user.profile_picture = jpeg_upload("b.jpg", color="blue")
+        self.user.save()
+        new = self.process()
+        self.assertNotEqual(new["digest"], old["digest"])
+        for formats in old["sizes"].values():
+            self.assertFalse(any(default_storage.exists(name) for name in formats.values()))
+        for formats in new["sizes"].values():
+            self.assertTrue(all(default_storage.exists(name) for name in formats.values()))
+
+        self.user.profile_picture = None
+        self.user.save()
+        self.assertEqual(self.process(), {})
+        for formats in new["sizes"].values():
+            self.assertFalse(any(default_storage.exists(name) for name in formats.values()))
@@ -1,10 +1,16 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from .metrics import metrics_view
+from .async_views import login_user_async, login_api_async, get_form_fields_async, form_list_async, \
+    employee_list_data_async, form_detail_api_async, employee_list_by_form_api_async
 from .views import register_user, login_user, dashboard_view, logout_user,change_password,\
-    profile_view, form_builder, save_form, form_list, form_detail, create_employee_view, get_form_fields, \
-    save_employee, employee_list, delete_employee, edit_employee, home_page,UserRegisterAPI, UserLoginAPI, UserProfileAPI, \
+    profile_view, profile_picture_variant, form_builder, save_form, form_list, form_detail, create_employee_view, get_form_fields, \
+    save_employee, employee_list, export_employees, delete_employee, edit_employee, home_page,UserRegisterAPI, UserLoginAPI, UserProfileAPI, \
     ChangePasswordAPI, UserUpdateAPI, DynamicFormDetailAPI, DynamicFormListAPI, DynamicFormCreateAPI, \
-        EmployeeCreateAPIView, EmployeeListByFormAPIView, EmployeeUpdateAPIView, EmployeeDeleteAPIView
+        EmployeeCreateAPIView, EmployeeListByFormAPIView, EmployeeUpdateAPIView, EmployeeDeleteAPIView, \
+        EmployeeImportAPIView, EmployeeSearchAPIView, EmployeeBatchAPIView, \
+        EmployeeFilterDeleteAPIView, DynamicFormDeleteAPI, DeletionJobDetailAPI, FormAggregationAPIView, \
+        TaskListAPI, TaskDetailAPI
 
 
 urlpatterns = [
@@ -15,6 +21,7 @@ urlpatterns = [
     path("logout/", logout_user, name="logout"),
     path("change-password/", change_password, name="change_password"),
     path("profile/", profile_view, name="profile"),
+    path("users/<int:user_id>/avatar/<int:size>/<str:digest>/", profile_picture_variant, name="profile_picture_variant"),
 
     path("form/builder/", form_builder, name="form_builder"),
     path("form/save-form/", save_form, name="save_form"),
@@ -26,10 +33,13 @@ urlpatterns = [
     path("employee/get-form-fields/<int:form_id>/", get_form_fields, name="get_form_fields"),
     path("employee/save/", save_employee, name="save_employee"),
     path("employee/list/", employee_list, name="employee_list"),
+    path("employee/export/<int:form_id>/", export_employees, name="export_employees"),
     path('employee/delete/<int:employee_id>/', delete_employee, name='delete_employee'),
     path('employee/edit/<int:employee_id>/', edit_employee, name='edit_employee'),
     
     
+    path("metrics/", metrics_view, name="metrics"),
+
     path('api/register/', UserRegisterAPI.as_view(), name='api-register'),
     path('api/login/', UserLoginAPI.as_view(), name='api-login'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -39,8 +49,26 @@ urlpatterns = [
     path("api/forms/", DynamicFormListAPI.as_view(), name="form-list"),
     path("api/forms/create/", DynamicFormCreateAPI.as_view(), name="form-create"),
     path("api/forms/<int:id>/", DynamicFormDetailAPI.as_view(), name="form-detail"),
+    path("api/forms/<int:id>/aggregations/", FormAggregationAPIView.as_view(), name="form-aggregations"),
+    path("api/forms/<int:id>/delete/", DynamicFormDeleteAPI.as_view(), name="form-delete"),
     path("api/employees/create/", EmployeeCreateAPIView.as_view(), name="employee-create"),
+    path("api/employees/batch/", EmployeeBatchAPIView.as_view(), name="employee-batch"),
+    path("api/employees/import/<int:form_id>/", EmployeeImportAPIView.as_view(), name="employee-import"),
     path("api/employees/form/<int:form_id>/", EmployeeListByFormAPIView.as_view(), name="employee-list-by-form"),
+    path("api/employees/form/<int:form_id>/search/", EmployeeSearchAPIView.as_view(), name="employee-search"),
+    path("api/employees/form/<int:form_id>/delete/", EmployeeFilterDeleteAPIView.as_view(), name="employee-filter-delete"),
+    path("api/deletions/<int:id>/", DeletionJobDetailAPI.as_view(), name="deletion-job-detail"),
+    path("api/tasks/", TaskListAPI.as_view(), name="task-list"),
+    path("api/tasks/<int:id>/", TaskDetailAPI.as_view(), name="task-detail"),
     path("api/employees/update/<int:id>", EmployeeUpdateAPIView.as_view(), name="employee-update"),
-    path("api/employees/delete/<int:employee_id>/", EmployeeDeleteAPIView.as_view(), name="employee-delete")
+    path("api/employees/delete/<int:employee_id>/", EmployeeDeleteAPIView.as_view(), name="employee-delete"),
+
+    # Async views, for ASGI deployments
+    path("async/login/", login_user_async, name="login_async"),
+    path("api/async/login/", login_api_async, name="api-login-async"),
+    path("async/form/list/", form_list_async, name="form_list_async"),
+    path("async/employee/get-form-fields/<int:form_id>/", get_form_fields_async, name="get_form_fields_async"),
+    path("async/employee/list/data/", employee_list_data_async, name="employee_list_data_async"),
+    path("api/async/forms/<int:id>/", form_detail_api_async, name="form-detail-async"),
+    path("api/async/employees/form/<int:form_id>/", employee_list_by_form_api_async, name="employee-list-by-form-async"),
 ]
\ No newline at end of file
@@ -1,17 +1,67 @@
 import json
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
-from django.http import JsonResponse, HttpResponseRedirect
+from django.http import FileResponse, Http404, JsonResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.contrib.auth import get_user_model, update_session_auth_hash
 from django.contrib.auth.hashers import make_password, check_password
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from .models import DynamicForm, DynamicField, Employee, EmployeeFieldValue
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
+from django.utils.cache import patch_vary_headers
+from .models import DeletionJob, DynamicForm, Task, DynamicField, Employee, EmployeeFieldValue
+from .aggregations import facet_counts
+from .avatars import CONTENT_TYPES as AVATAR_CONTENT_TYPES
+from .filters import FilterError, active_filters, filter_employees
+from .exporters import CONTENT_TYPES, EXPORT_FORMATS, export_employees as export_employee_rows
+from .routers import ReplicaReadsMixin, replica_reads
+from .schema_cache import get_form_schema
+from .sorting import SORT_PARAM, SortError, parse_sort, sort_employees
+from .services import create_employee, create_form, update_employee_values, delete_employee as delete_employee_record
 
 
 User = get_user_model()
 
+EMPLOYEE_LIST_PAGE_SIZE = 50
+EMPLOYEE_LIST_MAX_PAGE_SIZE = 200
+
+
+def get_page_size(request, default, maximum):
+    try:
+        page_size = int(request.GET.get("page_size", default))
+    except ValueError:
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+
+def selected_form_id(request):
+    """The ``form`` parameter of the employee list as an int, or None when missing or malformed."""
+    try:
+        return int(request.GET["form"])
+    except (KeyError, ValueError):
+        return None
+
+
+def employee_list_page(employees, request, sort):
+    """Order the employee_list rows and return their Paginator (sync and async views share it).
+
+    ``employees`` is already filtered; ``sort`` is a Sort or None (newest first).
+    """
+    employees = sort_employees(employees, sort) if sort else employees.order_by("-created_at", "-id")
+    return Paginator(employees.values_list("id", "data"), get_page_size(request, EMPLOYEE_LIST_PAGE_SIZE, EMPLOYEE_LIST_MAX_PAGE_SIZE))
+
+
+def employee_list_rows(employees, fields):
+    """``{"id", "values"}`` rows from ``(id, data)`` pairs, with one value per field ("" when unset)."""
+    keys = [str(field.id) for field in fields]
+    return [
+        {"id": employee_id, "values": ["" if data.get(key) is None else data[key] for key in keys]}
+        for employee_id, data in employees
+    ]
+
+
 def home_page(request):
     return render(request, 'home.html')
 
@@ -127,6 +177,28 @@ def profile_view(request):
         user.save()
 
         return JsonResponse({"success": True, "message": "Profile updated successfully"})
+
+
+def profile_picture_variant(request, user_id, size, digest):
+    """Serve a resized profile picture, WebP when the client accepts it.
+
+    The URL changes with the picture (see accounts.avatars), so the file is
+    cached as immutable.
+    """
+    variants = User.objects.filter(id=user_id).values_list("profile_picture_variants", flat=True).first() or {}
+    formats = variants.get("sizes", {}).get(str(size))
+    if variants.get("digest") != digest or not formats:
+        raise Http404("Profile picture not found")
+
+    file_format = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+    try:
+        picture = default_storage.open(formats[file_format], "rb")
+    except FileNotFoundError:
+        raise Http404("Profile picture not found")
+    response = FileResponse(picture, content_type=AVATAR_CONTENT_TYPES[file_format])
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    patch_vary_headers(response, ["Accept"])
+    return response
     
 
 
@@ -136,6 +208,7 @@ def form_builder(request):
 
 
 
+@replica_reads
 def form_list(request):
     forms = DynamicForm.objects.all()
     return render(request, "formbuilder/form_list.html", {"forms": forms})
@@ -154,29 +227,29 @@ def save_form(request):
         if not form_name or not fields:
             return JsonResponse({"success": False, "error": "Form name and fields are required"}, status=400)
 
-        form = DynamicForm.objects.create(
-            name=form_name,
-            description=form_description
+        form = create_form(
+            {"name": form_name, "description": form_description},
+            [
+                {
+                    "label": field.get("label"),
+                    "field_type": field.get("field_type"),
+                    "required": field.get("required", True),
+                    "options": field.get("options", None),
+                    "placeholder": field.get("placeholder", ""),
+                    "help_text": field.get("help_text", ""),
+                    "order": field.get("order", index),
+                }
+                for index, field in enumerate(fields, start=1)
+            ],
         )
 
-        for index, field in enumerate(fields, start=1):
-            DynamicField.objects.create(
-                form=form,
-                label=field.get("label"),
-                field_type=field.get("field_type"),
-                required=field.get("required", True),
-                options=field.get("options", None),
-                placeholder=field.get("placeholder", ""),
-                help_text=field.get("help_text", ""),
-                order=field.get("order", index)
-            )
-
         return JsonResponse({"success": True, "message": "Form saved successfully", "form_id": form.id, "redirect_url": "/accounts/form/list/"})
 
     return JsonResponse({"success": False, "error": "Invalid request"}, status=400)
 
 
 
+@replica_reads
 def form_detail(request, form_id):
     form = get_object_or_404(DynamicForm, id=form_id)
     fields = form.fields.all()
@@ -192,27 +265,28 @@ def create_employee_view(request):
     return render(request, "employee/create_employee.html", {"forms": forms})
 
 
-def get_form_fields(request, form_id):
-    print("dark")
-    try:
-        form = DynamicForm.objects.get(id=form_id)
-        fields = form.fields.all().order_by("order")
-
-        fields_data = []
-        for f in fields:
-            fields_data.append({
-                "id": f.id,
-                "label": f.label,
-                "field_type": f.field_type,
-                "required": f.required,
-                "placeholder": f.placeholder,
-                "help_text": f.help_text,
-                "options": f.options if f.options else []
-            })
+def form_fields_data(schema):
+    return [
+        {
+            "id": f["id"],
+            "label": f["label"],
+            "field_type": f["field_type"],
+            "required": f["required"],
+            "placeholder": f["placeholder"],
+            "help_text": f["help_text"],
+            "options": f["options"] if f["options"] else []
+        }
+        for f in schema["fields"]
+    ]
+
 
-        return JsonResponse({"success": True, "form": form.name, "fields": fields_data})
-    except DynamicForm.DoesNotExist:
+@replica_reads
+def get_form_fields(request, form_id):
+    schema = get_form_schema(form_id)
+    if schema is None:
         return JsonResponse({"success": False, "error": "Form not found"}, status=404)
+
+    return JsonResponse({"success": True, "form": schema["name"], "fields": form_fields_data(schema)})
     
     
 @login_required 
@@ -226,60 +300,102 @@ def save_employee(request):
             fields = data.get("fields", [])
 
             form = get_object_or_404(DynamicForm, id=form_id)
-            employee = Employee.objects.create(form=form)
-
-            for field_data in fields:
-                field_id = field_data.get("field_id")
-                value = field_data.get("value")
-
-                field = get_object_or_404(DynamicField, id=field_id, form=form)
-                EmployeeFieldValue.objects.create(
-                    employee=employee,
-                    field=field,
-                    value=value
-                )
+            create_employee(form, fields)
 
             return JsonResponse({"success": True, "message": "Employee created successfully!"})
 
+        except ValidationError as e:
+            return JsonResponse({"success": False, "error": " ".join(e.messages)}, status=400)
+
         except Exception as e:
             return JsonResponse({"success": False, "error": str(e)}, status=400)
 
     return JsonResponse({"error": "Invalid request"}, status=400)
 
 
+@replica_reads
 def employee_list(request):
     forms = DynamicForm.objects.all()
-    selected_form_id = request.GET.get("form")
-    employees = Employee.objects.all()
+    form_id = selected_form_id(request)
     selected_form = None
     fields = None
+    rows = []
+    page = None
+    facets = {}
+    filter_error = None
+    sort = None
 
-    if selected_form_id:
-        selected_form = DynamicForm.objects.filter(id=selected_form_id).first()
+    if form_id is not None:
+        selected_form = DynamicForm.objects.filter(id=form_id).first()
 
         if selected_form:
-            employees = employees.filter(form_id=selected_form.id)
-            fields = selected_form.fields.all()
-            for key, value in request.GET.items():
-                if key.startswith("field_") and value.strip():
-                    field_id = key.split("_")[1]
-                    employees = employees.filter(
-                        field_values__field_id=field_id,
-                        field_values__value__icontains=value
-                    )
+            fields = list(selected_form.fields.all())
+            try:
+                employees = filter_employees(Employee.objects.filter(form_id=selected_form.id), fields, request.GET)
+                if request.GET.get("facets") in ("1", "true"):
+                    facets = facet_counts(Employee.objects.filter(form_id=selected_form.id), fields, request.GET)
+            except FilterError as e:
+                filter_error = str(e)
+                employees = Employee.objects.none()
+            try:
+                sort = parse_sort(request.GET.get(SORT_PARAM), fields)
+            except SortError:
+                sort = None
+
+            page = employee_list_page(employees, request, sort).get_page(request.GET.get("page"))
+            rows = employee_list_rows(page, fields)
+
+    query_params = request.GET.copy()
+    query_params.pop("page", None)
+    sort_params = query_params.copy()
+    sort_params.pop(SORT_PARAM, None)
 
     return render(request, "employee/employee_list.html", {
         "forms": forms,
-        "employees": employees.distinct(),
-        "selected_form_id": selected_form_id,
+        "rows": rows,
+        "page": page,
+        "query_string": query_params.urlencode(),
+        "selected_form_id": form_id,
         "selected_form": selected_form,
         "fields": fields,
+        "facets": facets,
+        "filter_error": filter_error,
+        "sort": sort,
+        "sort_query_string": sort_params.urlencode(),
     })
-    
-    
+
+
+@login_required
+@replica_reads
+def export_employees(request, form_id):
+    form = get_object_or_404(DynamicForm, id=form_id)
+    file_format = request.GET.get("format", "csv")
+    if file_format not in EXPORT_FORMATS:
+        return JsonResponse({"success": False, "error": f"Unsupported format {file_format}"}, status=400)
+    compress = request.GET.get("gzip") in ("1", "true")
+
+    fields = list(form.fields.all())
+    try:
+        employees = filter_employees(Employee.objects.filter(form=form), fields, request.GET)
+    except FilterError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+    # The body streams after the view returns, so pin the database chosen now.
+    employees = employees.using(employees.db)
+
+    filename = f"form-{form.id}-employees.{file_format}"
+    if compress:
+        filename += ".gz"
+    response = StreamingHttpResponse(
+        export_employee_rows(employees, fields, file_format, compress),
+        content_type="application/gzip" if compress else CONTENT_TYPES[file_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 def delete_employee(request, employee_id):
     employee = get_object_or_404(Employee, id=employee_id)
-    employee.delete()
+    delete_employee_record(employee)
 
     form_id = request.GET.get('form', '')
     if form_id:
@@ -295,13 +411,11 @@ def edit_employee(request, employee_id):
     existing_values = {fv.field.id: fv.value for fv in employee.field_values.all()}
 
     if request.method == "POST":
-        for field in fields:
-            field_value = request.POST.get(f'field_{field.id}', '')
-            fv, created = EmployeeFieldValue.objects.get_or_create(
-                employee=employee, field=field
-            )
-            fv.value = field_value
-            fv.save()
+        update_employee_values(
+            employee,
+            {field.id: field for field in fields},
+            {field.id: request.POST.get(f'field_{field.id}', '') for field in fields},
+        )
         return redirect(f'/accounts/employee/list/?form={form.id}')
 
     return render(request, 'employee/edit_employee.html', {
@@ -322,8 +436,20 @@ from rest_framework.response import Response
 from rest_framework import status, generics
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from django.utils.dateparse import parse_datetime
+from .conditional import ConditionalGetMixin, make_etag
+from .pagination import EmployeeKeysetPagination, FormKeysetPagination
+from .renderers import EMPLOYEE_RENDERER_CLASSES, FAST_RENDERER_CLASSES, CompactRenderer
+from .rows import EMPLOYEE_COLUMNS, FORM_COLUMNS, compact_rows, employee_rows, form_rows
+from .search import filter_contains
+from .aggregations import DATE_BUCKETS, DEFAULT_DATE_BUCKET, DEFAULT_HISTOGRAM_BINS, MAX_HISTOGRAM_BINS, aggregate_form
+from .batch import MAX_BATCH_OPERATIONS, run_batch
+from .deletions import delete_form, delete_matching_employees
+from .importers import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, ImportFileError, detect_format, import_employees, open_text
 from .serializers import UserRegisterSerializer, UserLoginSerializer, UserDetailSerializer, ChangePasswordSerializer,\
-    UserUpdateSerializer, DynamicFormSerializer, EmployeeCreateSerializer, EmployeeReadSerializer, EmployeeUpdateSerializer
+    UserUpdateSerializer, DynamicFormSerializer, EmployeeCreateSerializer, EmployeeUpdateSerializer, \
+    EmployeeSnapshotSerializer, DeletionJobSerializer, TaskSerializer
 
 
 class UserRegisterAPI(APIView):
@@ -362,7 +488,7 @@ class UserProfileAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
+        user = User.objects.get(pk=request.user.pk)  # request.user may be the cached, partial user
         serializer = UserDetailSerializer(user)
         return Response({
             "success": True,
@@ -378,7 +504,7 @@ class ChangePasswordAPI(APIView):
         serializer = ChangePasswordSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        user = request.user
+        user = User.objects.get(pk=request.user.pk)
         current_password = serializer.validated_data['current_password']
         new_password = serializer.validated_data['new_password']
 
@@ -395,12 +521,12 @@ class UserUpdateAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = UserUpdateSerializer(request.user)
+        serializer = UserUpdateSerializer(User.objects.get(pk=request.user.pk))
         return Response(serializer.data)
 
     def put(self, request):
         serializer = UserUpdateSerializer(
-            request.user,
+            User.objects.get(pk=request.user.pk),
             data=request.data,
             partial=True,
             context={"request": request},
@@ -420,32 +546,260 @@ class DynamicFormCreateAPI(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
 
-class DynamicFormListAPI(generics.ListAPIView):
-    queryset = DynamicForm.objects.all()
+class DynamicFormListAPI(ReplicaReadsMixin, generics.ListAPIView):
+    """Forms with their fields, built from ``.values()`` rows (see accounts.rows)."""
+    queryset = DynamicForm.objects.values(*FORM_COLUMNS)
     serializer_class = DynamicFormSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FormKeysetPagination
+    renderer_classes = FAST_RENDERER_CLASSES
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return self.get_paginated_response(form_rows(page))
 
 
-class DynamicFormDetailAPI(generics.RetrieveAPIView):
+class DynamicFormDetailAPI(ReplicaReadsMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = DynamicForm.objects.all()
     serializer_class = DynamicFormSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = "id"
+
+    def get_etag(self, request, *args, **kwargs):
+        schema = get_form_schema(self.kwargs["id"])
+        return make_etag("form", schema["id"], schema["schema_version"], schema["updated_at"]) if schema else None
+
+    def get_last_modified(self, request, *args, **kwargs):
+        schema = get_form_schema(self.kwargs["id"])
+        return int(parse_datetime(schema["updated_at"]).timestamp()) if schema else None
+
+    def retrieve(self, request, *args, **kwargs):
+        schema = get_form_schema(self.kwargs["id"])
+        if schema is None:
+            raise Http404
+        schema = dict(schema)
+        schema.pop("schema_version")
+        return Response(schema)
     
 
+def deletion_response(request, deleted, job):
+    if job is None:
+        return Response({"success": True, "deleted": deleted})
+    return Response(
+        {
+            "success": True,
+            "job": DeletionJobSerializer(job).data,
+            "status_url": request.build_absolute_uri(reverse("deletion-job-detail", args=[job.id])),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+class DynamicFormDeleteAPI(APIView):
+    """Delete a form and its employees; large forms are deleted in the background."""
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request, id):
+        form = get_object_or_404(DynamicForm, id=id)
+        return deletion_response(request, *delete_form(form, request.user))
+
+
+class FormAggregationAPIView(ReplicaReadsMixin, APIView):
+    """Counts, option group-bys, numeric and date statistics and facets for a form.
+
+    Honours the employee_list ``field_<id>`` filters. ``?fields=1,2`` limits
+    the aggregated fields, ``?bins=`` sets the number of histogram bins and
+    ``?bucket=day|week|month|quarter|year`` the date bucketing.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        form = get_object_or_404(DynamicForm, id=id)
+        fields = list(form.fields.all())
+        try:
+            bins = int(request.query_params.get("bins", DEFAULT_HISTOGRAM_BINS))
+        except ValueError:
+            bins = 0
+        if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+            return Response({"success": False, "error": f"bins must be between 1 and {MAX_HISTOGRAM_BINS}."}, status=status.HTTP_400_BAD_REQUEST)
+        bucket = request.query_params.get("bucket", DEFAULT_DATE_BUCKET)
+        if bucket not in DATE_BUCKETS:
+            return Response({"success": False, "error": f"bucket must be one of {', '.join(DATE_BUCKETS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        selected = fields
+        if request.query_params.get("fields"):
+            ids = set(request.query_params["fields"].split(","))
+            selected = [field for field in fields if str(field.id) in ids]
+
+        try:
+            result = aggregate_form(Employee.objects.filter(form_id=form.id), fields, request.query_params, bins, bucket, selected)
+        except FilterError as e:
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"success": True, "form_id": form.id, **result})
+
+
 class EmployeeCreateAPIView(generics.CreateAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeCreateSerializer
     permission_classes = [IsAuthenticated]
     
 
-class EmployeeListByFormAPIView(generics.ListAPIView):
-    serializer_class = EmployeeReadSerializer
+class EmployeeImportAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, form_id):
+        form = get_object_or_404(DynamicForm, id=form_id)
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"success": False, "error": "A CSV or JSONL file is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get("format") or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response({"success": False, "error": f"Unsupported format {file_format}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = import_employees(form, open_text(upload.file), file_format, DEFAULT_BATCH_SIZE)
+        except ImportFileError as e:
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"success": report["failed"] == 0, **report})
+
+
+class EmployeeBatchAPIView(APIView):
+    """Create, update and delete many employees in one request (see accounts.batch)."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({"success": False, "error": "Expected an object with an operations list."}, status=status.HTTP_400_BAD_REQUEST)
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return Response({"success": False, "error": "operations must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return Response(
+                {"success": False, "error": f"At most {MAX_BATCH_OPERATIONS} operations per batch."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        atomic = request.data.get("atomic", True) not in (False, "false", "0")
+        report = run_batch(operations, atomic=atomic)
+        failed = atomic and not report["success"]
+        return Response(report, status=status.HTTP_400_BAD_REQUEST if failed else status.HTTP_200_OK)
+
+
+class EmployeeFilterDeleteAPIView(APIView):
+    """Delete the employees of a form matching the employee_list ``field_<id>``/``filter`` filters.
+
+    Without a filter, ``?all=true`` is required. Matches beyond one chunk
+    are deleted in the background; poll the returned ``status_url``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request, form_id):
+        form = get_object_or_404(DynamicForm, id=form_id)
+        filters = active_filters(request.query_params)
+        if not filters and request.query_params.get("all") not in ("1", "true"):
+            return Response(
+                {"success": False, "error": "Pass field_<id> filters or a filter, or all=true to delete every employee."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            return deletion_response(request, *delete_matching_employees(form, filters, request.user))
+        except FilterError as e:
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class DeletionJobDetailAPI(generics.RetrieveAPIView):
+    serializer_class = DeletionJobSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = "id"
 
     def get_queryset(self):
+        return DeletionJob.objects.filter(created_by=self.request.user)
+
+
+class TaskListAPI(generics.ListAPIView):
+    """The current user's latest background tasks, optionally ``?status=``."""
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        tasks = Task.objects.filter(created_by=self.request.user)
+        if self.request.query_params.get("status"):
+            tasks = tasks.filter(status=self.request.query_params["status"])
+        return tasks.order_by("-id")[:100]
+
+
+class TaskDetailAPI(generics.RetrieveAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = "id"
+
+    def get_queryset(self):
+        return Task.objects.filter(created_by=self.request.user)
+
+
+class EmployeeListByFormAPIView(ReplicaReadsMixin, ConditionalGetMixin, generics.ListAPIView):
+    """A form's employees; rows come from ``.values()`` and match EmployeeSnapshotSerializer.
+
+    ``?format=compact`` (or its Accept type) sends the fields once and each
+    employee as an array instead (see accounts.rows.compact_rows).
+    """
+    serializer_class = EmployeeSnapshotSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = EmployeeKeysetPagination
+    renderer_classes = EMPLOYEE_RENDERER_CLASSES
+
+    def get_etag(self, request, *args, **kwargs):
+        versions = DynamicForm.objects.filter(id=self.kwargs.get("form_id")).values_list("schema_version", "data_version").first()
+        if versions is None:
+            return None
+        return make_etag("employees", self.kwargs.get("form_id"), *versions, request.get_full_path(), request.accepted_renderer.format)
+
+    def get_form_fields(self):
+        if not hasattr(self, "_form_fields"):
+            self._form_fields = list(DynamicField.objects.filter(form_id=self.kwargs.get("form_id")))
+        return self._form_fields
+
+    def get_queryset(self):
+        """The form's employees, narrowed by the employee_list ``field_<id>`` and ``filter`` parameters.
+
+        ``?sort=`` (see accounts.sorting) is applied by the paginator.
+        """
         form_id = self.kwargs.get("form_id")
-        return Employee.objects.filter(form_id=form_id).prefetch_related("field_values__field")
+        self.sort = parse_sort(self.request.query_params.get(SORT_PARAM), self.get_form_fields())
+        employees = Employee.objects.filter(form_id=form_id).values(*EMPLOYEE_COLUMNS)
+        return filter_employees(employees, self.get_form_fields(), self.request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["form_fields"] = self.get_form_fields()
+        return context
+
+    def list(self, request, *args, **kwargs):
+        try:
+            page = self.paginate_queryset(self.get_queryset())
+        except (FilterError, SortError) as e:
+            return Response({"success": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if request.accepted_renderer.format == CompactRenderer.format:
+            return Response({
+                "next": self.paginator.get_next_link(),
+                "first": self.paginator.get_first_link(),
+                **compact_rows(page, self.get_form_fields()),
+            })
+        return self.get_paginated_response(employee_rows(page, self.get_form_fields()))
+
+
+class EmployeeSearchAPIView(EmployeeListByFormAPIView):
+    """Substring search over every field value of a form's employees (``?q=``)."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        term = self.request.query_params.get("q", "").strip()
+        if not term:
+            return queryset.none()
+        values = filter_contains(EmployeeFieldValue.objects.filter(field__form_id=self.kwargs.get("form_id")), term)
+        return queryset.filter(id__in=values.values("employee_id"))
 
 
 class EmployeeUpdateAPIView(generics.UpdateAPIView):
@@ -458,7 +812,7 @@ class EmployeeUpdateAPIView(generics.UpdateAPIView):
 class EmployeeDeleteAPIView(APIView):
     def delete(self, request, employee_id):
         employee = get_object_or_404(Employee, id=employee_id)
-        employee.delete()
+        delete_employee_record(employee)
         return Response(
             {"success": True, "message": "Employee deleted successfully"},
             status=status.HTTP_204_NO_CONTENT
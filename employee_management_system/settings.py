@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'accounts.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,13 +67,69 @@ WSGI_APPLICATION = 'employee_management_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Every SQLite connection runs these PRAGMAs on open. WAL lets readers work
+# alongside the single writer; synchronous=NORMAL is durable under WAL
+# except for the last commits on power loss. cache_size is negative KiB.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -20000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    'temp_store': 'MEMORY',
+}
+# Milliseconds a connection waits for the write lock before "database is locked"
+SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+# Seconds a connection is kept open for reuse across requests (0 closes it after each)
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+
+def sqlite_database(name, **extra):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_MAX_AGE > 0,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}={value}' for pragma, value in SQLITE_PRAGMAS.items()),
+            # Take the write lock when a transaction starts, so concurrent
+            # writers queue on busy_timeout instead of failing to upgrade.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': SQLITE_BUSY_TIMEOUT / 1000,
+        },
+        **extra,
+    }
+
+
 DATABASES = {
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3'),
+}
+
+# Optional read replica (see accounts.routers): views marked with
+# replica_reads send form/employee reads to it. Locally, point it at a
+# second file and refresh it with `manage.py sync_replica`.
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = sqlite_database(os.environ['DATABASE_REPLICA_NAME'], TEST={'MIRROR': 'default'})
+
+DATABASE_ROUTERS = ['accounts.routers.PrimaryReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# locmem is per process: with several workers use a shared backend (e.g.
+# 'django.core.cache.backends.db.DatabaseCache' or Redis) so schema
+# invalidations reach every worker. Cached JWT users hold only ids and
+# flags, no password hashes (see accounts.authentication).
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'employee-management-system',
     }
 }
 
+# Seconds a cached form schema (and its version pointer) may live
+SCHEMA_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,6 +176,14 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'assets')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads larger than this are streamed to a temporary file instead of memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
+
+# Square profile picture variants (px) rendered as WebP and JPEG by a task
+# after an upload; run `manage.py generate_profile_variants` to backfill
+# existing pictures.
+PROFILE_PICTURE_SIZES = (120, 240)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -128,10 +193,40 @@ AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     )
 }
 
+# Threads checking password hashes for the async login views (default: CPU
+# count) and how many checks may run or wait before logins get a 503
+# (default: four per thread)
+LOGIN_HASH_WORKERS = None
+LOGIN_MAX_PENDING = None
+
+# Seconds CachedJWTAuthentication keeps a token's user; saving the user drops it
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Default and maximum ?page_size= of the keyset-paginated list APIs
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+# Employees deleted per transaction by filter/form deletes, and the pause
+# between chunks that lets other writers in. Deletes larger than one chunk
+# run as a DeletionJob through a `deletions.run_job` task on the workers;
+# `manage.py run_deletion_jobs` re-queues jobs whose task failed.
+DELETE_CHUNK_SIZE = 1000
+DELETE_CHUNK_PAUSE = 0.05
+
+# Background tasks (accounts.queue) are run by `manage.py run_workers`.
+# When eager, they run in the request's process once it commits instead.
+# Failed attempts are retried after TASK_RETRY_DELAY seconds, doubling.
+TASKS_ALWAYS_EAGER = os.environ.get('TASKS_ALWAYS_EAGER', '') == '1'
+TASK_RETRY_DELAY = 10
+
+# When set, the /accounts/metrics/ scrape endpoint requires
+# "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(minutes=60),